@@ -6,22 +6,43 @@ A python implementation of BlackJack.
 :Date: 26-06-2021
 """
 
-import colorama
-import signal as _sig
+import os as _os
+import random as _random
+import struct as _struct
 import sys as _sys
 import time as _tm
-from random import shuffle as random_shuffle
+from array import array as _array
+from functools import lru_cache as _lru_cache
 
-colorama.init()
+
+class _Fore:
+    # ANSI colour codes as in colorama.Fore, colorama itself is only loaded by _init_console
+    RED = '\x1b[31m'
+    GREEN = '\x1b[32m'
+    YELLOW = '\x1b[33m'
+    BLUE = '\x1b[34m'
+    MAGENTA = '\x1b[35m'
+    CYAN = '\x1b[36m'
+    WHITE = '\x1b[37m'
+    RESET = '\x1b[39m'
+
+
+_BRIGHT = '\x1b[1m'  # colorama.Style.BRIGHT
 
 
 class Card:
-    __slots__ = '__rank', '__suit', '__value'
+    __slots__ = '__rank', '__suit', '__value', '__code', '__name'
 
-    def __init__(self, rank, suit, value):
+    def __init__(self, rank, suit, value, code=-1):
         self.__rank = rank
         self.__suit = suit
         self.__value = value
+        self.__code = code
+        self.__name = f'{rank} of {suit}'
+
+    @property
+    def code(self):
+        return self.__code
 
     @property
     def rank(self):
@@ -36,75 +57,376 @@ class Card:
         return self.__value
 
     def __str__(self):
-        return f'{self.rank} of {self.suit}'
+        return self.__name
 
 
-class Deck:
-    __slots__ = '__deck', '__rdeck', 'count'
+SUITS = ('Spade', 'Clover', 'Diamond', 'Heart')
+RANKS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K')
+
 
-    def __init__(self, count=1):
+def _build_cards():
+    cards = []
+    for suit in SUITS:
+        for rank in RANKS:
+            if rank.isdecimal():
+                value = int(rank)
+            elif rank == 'A':
+                value = 11
+            else:
+                value = 10
+            cards.append(Card(rank, suit, value, len(cards)))
+    return tuple(cards)
+
+
+# One shared Card per code (suit * 13 + rank index), decks only hold the codes
+CARDS = _build_cards()
+# Composition slot of each code: 0 for Ace, 1 - 8 for 2 - 9, 9 for tens
+VALUE_INDEX = bytes(min(code % 13, 9) for code in range(len(CARDS)))
+_CARD_VALUE = bytes(card.value for card in CARDS)  # Card.value of each code
+_VALUE_TABLE = VALUE_INDEX.ljust(256, b'\0')  # For bytes.translate of dealt codes
+
+# Card counting tags by VALUE_INDEX slot, and the running count start per deck after the first
+COUNT_SYSTEMS = {
+    'Hi-Lo': ((-1, 1, 1, 1, 1, 1, 0, 0, 0, -1), 0),
+    'KO': ((-1, 1, 1, 1, 1, 1, 1, 0, 0, -1), -4),
+    'Omega II': ((0, 1, 1, 2, 2, 2, 1, 0, -1, -2), 0),
+}
+
+RNG_KINDS = ('random', 'pcg64', 'philox')  # random is the stdlib Mersenne Twister
+
+
+class BatchRandom:
+    """
+    Deck rng over a NumPy Generator. random() hands out floats drawn size
+    at a time, so the per card cost is an iterator step, not a NumPy call.
+    """
+    __slots__ = 'generator', 'size', 'random', '__state', '__batch'
+
+    def __init__(self, generator, size=4096):
+        from itertools import chain
+        self.generator = generator
+        self.size = size
+        self.random = chain.from_iterable(iter(self.__draw, None)).__next__
+        self.__state = None  # Generator state before the current batch
+        self.__batch = None  # Iterator over the current batch, shared with random
+
+    def __draw(self):
+        self.__state = self.generator.bit_generator.state
+        self.__batch = iter(self.generator.random(self.size).tolist())
+        return self.__batch
+
+    def getstate(self):
+        """Generator state and floats used of the current batch, as random.Random.getstate."""
+        if self.__batch is None:
+            return self.generator.bit_generator.state, 0
+        return self.__state, self.size - self.__batch.__length_hint__()
+
+    def setstate(self, state):
+        from itertools import chain
+        state, used = state
+        self.generator.bit_generator.state = state
+        self.__batch = None
+        self.random = chain.from_iterable(iter(self.__draw, None)).__next__
+        for _ in range(used):  # Same batch drawn again, used floats skipped
+            self.random()
+
+    def spawn(self, n):
+        """n independent child streams, as BatchRandom."""
+        return [BatchRandom(generator, self.size) for generator in self.generator.spawn(n)]
+
+
+def make_rng(seed=None, kind='random', stream=None):
+    """
+    Deck rng of kind from RNG_KINDS. stream picks an independent stream of
+    seed, as for each simulate shard, None is seed's own. The numpy kinds
+    need NumPy and an int or None seed.
+    """
+    if kind == 'random':
+        return _random.Random(seed if stream is None else f'{seed}:{stream}')
+    if kind not in RNG_KINDS:
+        raise ValueError(f'RNG should be one of {", ".join(RNG_KINDS)}.')
+    import numpy
+    seq = numpy.random.SeedSequence(seed, spawn_key=() if stream is None else (stream,))
+    bits = numpy.random.PCG64(seq) if kind == 'pcg64' else numpy.random.Philox(seq)
+    return BatchRandom(numpy.random.Generator(bits))
+
+
+class Deck:
+    """
+    Shoe of count decks. Cards are drawn by lazy Fisher-Yates, each one
+    picked from the undealt rest when dealt, so no deal pays for a full
+    shuffle. shuffle picks when the dealt cards come back into play:
+        'empty': when the shoe runs out, even mid round
+        'cut': between rounds once penetration of the shoe is dealt
+        'round': between every round
+        'csm': returned cards go back into the undealt shoe, the dealt
+               cards leave it before each round
+    """
+    __slots__ = ('__codes', '__pos', '__fixed', '__rcodes', '__spent', '__full', '__left',
+                 '__counted', '__synced', 'count', 'rng', 'shuffle', 'penetration', 'shuffles',
+                 'profiler')
+
+    MODES = 'empty', 'cut', 'round', 'csm'
+
+    def __init__(self, count=1, rng=None, shuffle='empty', penetration=0.75):
         if count < 1:  # Handling Negatives and Zero
             raise ValueError('Atleast 1 deck needed to play')
+        if shuffle not in self.MODES:
+            raise ValueError(f'Shuffle mode should be one of {", ".join(self.MODES)}.')
+        if not 0 <= penetration <= 1:
+            raise ValueError('Penetration should be between 0 and 1.')
 
-        self.__deck = []
-        self.__rdeck = []
+        self.count = count
+        self.rng = _random if rng is None else rng  # Own stream, from make_rng or a random.Random
+        self.shuffle = shuffle
+        self.penetration = penetration  # Share of the shoe dealt before a 'cut' reshuffle
+        self.profiler = None
+        self.shuffles = 0  # Reshuffles since creation
+        self.__codes = _array('b', range(len(CARDS))) * count  # Shuffled as it is dealt
+        self.__pos = 0  # Index of next card to deal
+        self.__fixed = 0  # Codes before this index are dealt as they are, see load
+        self.__rcodes = _array('b')
+        self.__spent = _array('b')  # Shoe before the last reshuffle
+        self.__full = self.__left = ()  # Composition of the shoe when shuffled and left now
+        self.__counted = -1  # Shuffles the counts are for
+        self.__synced = 0  # Position the counts are at
+
+    def __gather(self):
+        # Every card off the table back into the shoe, in code order, so the
+        # shoe only depends on which cards are in it and the rng
+        if self.profiler:
+            self.profiler.start('reshuffle')
+        codes = self.__codes
+        if len(codes) - self.__pos + len(self.__rcodes) == self.count * len(CARDS):
+            codes[:] = _array('b', range(len(CARDS))) * self.count
+        else:  # Some still out
+            codes[:] = _array('b', sorted(codes[self.__pos:] + self.__rcodes))
+        del self.__rcodes[:]
+        self.__pos = self.__fixed = 0
+        self.shuffles += 1
+        if self.profiler:
+            self.profiler.stop()
+
+    def __reshuffle(self):
+        # Returned cards become the live shoe, buffers are rotated not reallocated
+        if self.profiler:
+            self.profiler.start('reshuffle')
+        spent = self.__spent
+        self.__spent, self.__codes = self.__codes, self.__rcodes
+        del spent[:]
+        self.__rcodes = spent
+        self.__codes[:] = _array('b', sorted(self.__codes))  # Code order, as in __gather
+        self.__pos = self.__fixed = 0
+        self.shuffles += 1
+        if self.profiler:
+            self.profiler.stop()
+
+    def __sync(self):
+        # Counts catch up with the cards dealt since the last read, each card once
+        if self.__counted != self.shuffles:  # New shoe, counted in full once
+            slots = self.__codes.tobytes().translate(_VALUE_TABLE)
+            self.__full = tuple(slots.count(slot) for slot in range(10))
+            self.__left = list(self.__full)
+            self.__counted = self.shuffles
+            self.__synced = 0
+        pos = self.__pos
+        if pos != self.__synced:
+            left = self.__left
+            for slot in self.__codes[self.__synced:pos].tobytes().translate(_VALUE_TABLE):
+                left[slot] -= 1
+            self.__synced = pos
+        return self.__left
 
-        for suit in ('Spade', 'Clover', 'Diamond', 'Heart'):
-            for rank in ('A', '2', '3', '4', '5', '6', '7', '8',
-                         '9', '10', 'J', 'Q', 'K'):
-                if rank.isdecimal():
-                    value = int(rank)
-                elif rank == 'A':
-                    value = 11
-                else:
-                    value = 10
-                self.__deck.append(Card(rank, suit, value))
+    @property
+    def cards_left(self):
+        """
+        Cards left in the shoe. 'empty' deals all of them before the
+        reshuffle, 'cut' and 'round' gather the shoe between rounds sooner.
+        """
+        return len(self.__codes) - self.__pos
+
+    def composition(self):
+        """Counts of cards left in the shoe by VALUE_INDEX slot (A, 2 - 9, 10)."""
+        return tuple(self.__sync())
+
+    def deal(self, n):
+        """Deals n card codes at once, use CARDS[code] for the Card object."""
+        codes = self.__codes
+        start = self.__pos
+        left = len(codes) - start
+        if start < self.__fixed or left < n:  # Loaded codes or a reshuffle on the way
+            get_code = self.get_code
+            return _array('b', [get_code() for _ in range(n)])
+        random = self.rng.random
+        for pos in range(start, start + n):  # get_code steps without the calls
+            swap = pos + int(random() * left)
+            codes[pos], codes[swap] = codes[swap], codes[pos]
+            left -= 1
+        self.__pos = start + n
+        return codes[start:start + n]
+
+    def dealt(self, start, shuffles):
+        """Codes dealt since position start of the shoe of shuffles, as bytes."""
+        if shuffles == self.shuffles:
+            return self.__codes[start:self.__pos].tobytes()
+        return (self.__spent[start:] + self.__codes[:self.__pos]).tobytes()
+
+    def getstate(self):
+        """Shoe order, returned cards and rng state, for setstate."""
+        return (self.count, self.shuffle, self.penetration, self.shuffles, self.__pos,
+                self.__fixed, self.__codes.tobytes(), self.__rcodes.tobytes(),
+                self.__spent.tobytes(), self.rng.getstate())
+
+    def setstate(self, state):
+        (self.count, self.shuffle, self.penetration, self.shuffles, self.__pos, self.__fixed,
+         codes, rcodes, spent, rng) = state
+        for buffer, data in ((self.__codes, codes), (self.__rcodes, rcodes),
+                             (self.__spent, spent)):
+            del buffer[:]
+            buffer.frombytes(data)
+        self.rng.setstate(rng)
+        self.__counted = -1  # Recounted on the next read
+
+    def load(self, codes):
+        """Replaces the live shoe with codes, dealt in the given order."""
+        del self.__codes[:]
+        self.__codes.frombytes(codes)
+        self.__pos = 0
+        self.__fixed = len(codes)
+        self.__counted = -1
+
+    def new_round(self):
+        """Called before each round, gathers the shoe as the shuffle mode asks."""
+        if self.shuffle == 'csm':  # Cards of past rounds are back in the shoe already
+            if self.__pos:
+                del self.__codes[:self.__pos]
+                self.__fixed = max(self.__fixed - self.__pos, 0)
+                self.__pos = 0
+                self.__counted = -1
+            return
+        if self.shuffle == 'empty' or not self.__pos and not self.__rcodes:
+            return
+        if self.shuffle != 'cut' or self.__pos >= self.penetration * self.count * len(CARDS):
+            self.__gather()
 
-        self.__deck *= count
-        random_shuffle(self.__deck)  # Shuffling at creation
+    @property
+    def position(self):
+        """Cards dealt since the last reshuffle."""
+        return self.__pos
 
     def get_card(self):
-        try:
-            card = self.__deck.pop()
-        except IndexError:
-            self.__deck = self.__rdeck
-            self.__rdeck = []
-            random_shuffle(self.__deck)
-            card = self.__deck.pop()
-        return card
+        pos = self.__pos
+        codes = self.__codes
+        if pos >= self.__fixed:  # Fisher-Yates step, swaps a random undealt card in
+            left = len(codes) - pos
+            if left <= 0:
+                self.__reshuffle()
+                pos, codes = 0, self.__codes
+                left = len(codes)
+                if not left:
+                    raise IndexError('deal from empty shoe')
+            swap = pos + int(self.rng.random() * left)
+            codes[pos], codes[swap] = codes[swap], codes[pos]
+        self.__pos = pos + 1
+        return CARDS[codes[pos]]
+
+    def get_code(self):
+        pos = self.__pos
+        codes = self.__codes
+        if pos >= self.__fixed:  # Same as get_card
+            left = len(codes) - pos
+            if left <= 0:
+                self.__reshuffle()
+                pos, codes = 0, self.__codes
+                left = len(codes)
+                if not left:
+                    raise IndexError('deal from empty shoe')
+            swap = pos + int(self.rng.random() * left)
+            codes[pos], codes[swap] = codes[swap], codes[pos]
+        self.__pos = pos + 1
+        return codes[pos]
+
+    def running_count(self, system='Hi-Lo'):
+        """
+        Running count of the cards dealt since the shuffle, system is a
+        COUNT_SYSTEMS name or a (tags, start per extra deck) pair.
+        """
+        tags, start = COUNT_SYSTEMS[system] if isinstance(system, str) else system
+        left = self.__sync()
+        return start * (self.count - 1) + sum(
+            tag * (full - now) for tag, full, now in zip(tags, self.__full, left))
+
+    def true_count(self, system='Hi-Lo'):
+        """Running count per deck left in the shoe."""
+        cards_left = self.cards_left
+        return self.running_count(system) * 52 / cards_left if cards_left else 0.0
+
+    def unseen(self, hidden=()):
+        """
+        Counts of the cards a player hasn't seen by VALUE_INDEX slot: the
+        live shoe, the hidden codes, such as the dealer's hole card, and
+        in 'empty' mode the returned cards the shoe is refilled from.
+        """
+        left = list(self.__sync())
+        codes = bytes(hidden)
+        if self.shuffle == 'empty':
+            codes += self.__rcodes.tobytes()
+        for slot in codes.translate(_VALUE_TABLE):
+            left[slot] += 1
+        return tuple(left)
 
     def return_cards(self, *cards):
-        for card in cards:
-            if isinstance(card, Card):
-                self.__rdeck.append(card)
-            else:  # For debug purpose
-                raise Exception('Invalid card object')
+        try:
+            codes = [card.code for card in cards]
+        except AttributeError:  # For debug purpose
+            raise Exception('Invalid card object')
+        if codes and min(codes) < 0:  # Cards not dealt from a Deck
+            raise Exception('Invalid card object')
+        self.return_codes(codes)
+
+    def return_codes(self, codes):
+        if self.shuffle == 'csm':  # Drawn again from the next round on
+            self.__codes.extend(codes)
+            self.__counted = -1
+        else:
+            self.__rcodes.extend(codes)
 
 
 class Hand:
-    __slots__ = 'count', 'bet', 'cards', 'value', '__aces', 'status'
+    __slots__ = ('count', 'bet', 'stake', 'cards', 'value', '__hard', '__aces', '__pair',
+                 'status', 'doubled', 'view')
 
     def __init__(self, bet, count=0):
-        self.count = count
-        self.bet = bet
         self.cards = []
+        self.reset(bet, count)
+
+    def reset(self, bet, count=0):
+        """Empties the hand for a new round, the cards list is kept."""
+        self.count = count
+        self.bet = bet  # Amount paid back to player after settlement
+        self.stake = bet  # Amount taken from player
+        self.cards.clear()
         self.value = 0
+        self.__hard = 0  # Total with every ace counted as 1
         self.__aces = 0
+        self.__pair = 0  # Card value when the first two cards are a pair
         self.status = 'Live'
         # Live, BlackJack, Bust, Stand, Double, Surrender, Win, Lost, -, Push
+        self.doubled = False  # Kept after settlement replaces the Double status
+        self.view = None  # Render cache of UserInterface, reset on card changes
 
     def __calibrate(self):
-        value = 0
-        aces = 0
-        for card in self.cards:
-            aces += 1 if card.rank == 'A' else 0
-            value += card.value
-        self.__aces = aces
-        self.value = value
-
-        while self.__aces and self.value > 21:
-            self.value -= 10
-            self.__aces -= 1
+        hard = self.__hard
+        if self.__aces and hard < 12:  # One ace can still count as 11
+            self.value = hard + 10
+        else:
+            self.value = hard
+
+        cards = self.cards
+        if len(cards) == 2 and cards[0].value == cards[1].value:
+            self.__pair = cards[0].value
+        else:
+            self.__pair = 0
 
     def __update_sts(self):
         if len(self.cards) == 2 and self.value == 21:
@@ -115,23 +437,77 @@ class Hand:
 
     def add_card(self, card):
         self.cards.append(card)
+        self.view = None
+        value = card.value
+        if value == 11:
+            self.__aces += 1
+            self.__hard += 1
+        else:
+            self.__hard += value
         self.__calibrate()
         self.__update_sts()
 
     def approx_val(self):
-        if self.value < 22 and self.__aces:
+        if self.value < 22 and self.soft:
             return f'{self.value - 10}/{self.value}'
         else:
             return str(self.value)
 
+    @property
+    def pair(self):
+        return self.__pair
+
     def pop_card(self):
         card = self.cards.pop()
+        self.view = None
+        value = card.value
+        if value == 11:
+            self.__aces -= 1
+            self.__hard -= 1
+        else:
+            self.__hard -= value
         self.__calibrate()
         return card
 
+    @property
+    def soft(self):
+        return self.value != self.__hard
+
+    @property
+    def state(self):
+        """
+        Small int key of the hand: value (5 bits), soft flag (1 bit) and
+        pair card value above those, always below HAND_STATES.
+        """
+        return self.value | (self.value != self.__hard) << 5 | self.__pair << 6
+
+
+HAND_STATES = 12 << 6
+STRATEGY_DECKS = 6  # Shoe the default strategy table is built for, as simulate deals
+STATUSES = ('Live', 'BlackJack', 'Bust', 'Stand', 'Double', 'Surrender', 'Win', 'Lost', 'Push')
+STATUS_CODE = {status: code for code, status in enumerate(STATUSES)}
+_LIVE, _BLACKJACK, _BUST, _STAND, _DOUBLE, _SURRENDER = range(6)  # First STATUSES codes
+
+
+def _two_cards():
+    # Value, hard total, aces, pair and status of a dealt hand by card values a * 12 + b
+    tables = [bytearray(144) for _ in range(5)]
+    for one in range(2, 12):
+        for two in range(2, 12):
+            aces = (one == 11) + (two == 11)
+            hard = one + two - 10 * aces
+            value = hard + 10 if aces else hard
+            for table, entry in zip(tables, (value, hard, aces, one if one == two else 0,
+                                             _BLACKJACK if value == 21 else _LIVE)):
+                table[one * 12 + two] = entry
+    return tuple(map(bytes, tables))
+
+
+_TWO_CARDS = _two_cards()
+
 
 class Player:
-    __slots__ = 'name', 'balance', 'hands'
+    __slots__ = 'name', 'balance', 'hands', '__spare'
 
     def __init__(self, name, balance=1000):
         if balance < 0:
@@ -140,15 +516,26 @@ class Player:
         self.name = name
         self.balance = balance
         self.hands = []  # Upto 4 Hands
+        self.__spare = []  # Hands of past rounds, reused by add_hand
 
     def add_hand(self, bet):
         if self.have_bal(bet):
             self.balance -= bet
             hand_count = len(self.hands) + 1
-            self.hands.append(Hand(bet, hand_count))
+            if self.__spare:
+                hand = self.__spare.pop()
+                hand.reset(bet, hand_count)
+            else:
+                hand = Hand(bet, hand_count)
+            self.hands.append(hand)
         else:  # For debug purpose
             raise ValueError('Bet not enough.')
 
+    def clear_hands(self):
+        """Ends the round, the hands are reset and reused by later add_hand calls."""
+        self.__spare += self.hands
+        self.hands.clear()
+
     def have_bal(self, amount):
         return True if (0 < amount <= self.balance) else False
 
@@ -161,12 +548,1223 @@ class Dealer:
         self.hand = None
 
     def add_hand(self):
-        self.hand = Hand(0)
+        if self.hand is None:
+            self.hand = Hand(0)
+        else:  # Same hand every round
+            self.hand.reset(0)
+
+
+class Table:
+    """
+    Headless round engine, holds the deck, dealer and seated players.
+    Policies are plain callables, so rounds can run without any terminal:
+        bet_policy(player) -> amount
+        policy(player, hand, op_lst, upcard) -> one of op_lst
+    """
+    __slots__ = ('deck', 'dealer', 'players', 'rounds', 'history', 'stats', '__start',
+                 '__actions', '__profiler')
+
+    def __init__(self, players, deck_count=1, deck=None):
+        self.deck = Deck(deck_count) if deck is None else deck
+        self.dealer = Dealer()
+        self.players = players
+        self.rounds = 0
+        self.history = None  # HandHistory receiving every settled round
+        self.stats = None  # RunStats receiving every settled round
+        self.__start = 0, 0, ()  # Shoe position, shuffles and bets of the round
+        self.__actions = ''  # Decisions of the round, kept only while a history is recorded
+        self.__profiler = None
+
+    async def aplay_hand(self, player, hand, policy):
+        # Same as play_hand for a coroutine policy, such as UserInterface input
+        upcard = self.dealer.hand.cards[0]
+        while hand.status == 'Live':
+            selection = await policy(player, hand, hand_options(player, hand), upcard)
+            self.apply(player, hand, selection)
+
+    async def aplay_players(self, policy):
+        for player in self.players:
+            for hand in player.hands:
+                await self.aplay_hand(player, hand, policy)
+
+    def apply(self, player, hand, selection):
+        deck = self.deck
+        if self.history is not None:
+            self.__actions += selection
+        if selection == 'H':
+            hand.add_card(deck.get_card())
+        elif selection == 'S':
+            hand.status = 'Stand'
+        elif selection == 'D':
+            double_down(player, hand, deck.get_card())
+        elif selection == 'L':
+            split(player, hand, deck.get_card(), deck.get_card())
+        elif selection == 'R':
+            surrender(player, hand)
+        else:  # For debug purpose
+            raise Exception(f'Problem on Looping Gameplay\nPlayer={player.name} '
+                            f'Hand={hand.count} Selection={selection}')
+
+    def collect(self):
+        # Cards go back to the shoe in one return, the hands are kept for reuse
+        codes = [card.code for card in self.dealer.hand.cards]
+        for player in self.players:
+            for hand in player.hands:
+                player.balance += hand.bet
+                codes += [card.code for card in hand.cards]
+            player.clear_hands()
+        self.deck.return_codes(codes)
+
+    def deal(self):
+        deck = self.deck
+        dealer_hand = self.dealer.hand
+        for _ in range(2):
+            dealer_hand.add_card(deck.get_card())
+            for person in self.players:
+                person.hands[0].add_card(deck.get_card())
+
+    def getstate(self):
+        """Round count, shoe, players and hands in play as plain data, for setstate."""
+        def hand_state(hand):
+            return (hand.count, hand.bet, hand.stake, bytes(card.code for card in hand.cards),
+                    hand.status, hand.doubled)
+
+        dealer = self.dealer.hand
+        return (self.rounds, self.__start, self.__actions, self.deck.getstate(),
+                None if dealer is None else hand_state(dealer),
+                [(player.name, player.balance, [hand_state(hand) for hand in player.hands])
+                 for player in self.players])
+
+    def play_dealer(self):
+        dealer_hand = self.dealer.hand
+        hand_values = [hand.value for player in self.players for hand in player.hands
+                       if hand.value < 22]
+        if hand_values:  # Checking if dealer needs to play
+            player_max = max(hand_values)
+            deck = self.deck
+            while dealer_hand.value < 18 and dealer_hand.value < player_max:
+                dealer_hand.add_card(deck.get_card())
+            if dealer_hand.status == 'Live':
+                dealer_hand.status = 'Stand'
+        else:
+            dealer_hand.status = 'Win'
+
+    def play_hand(self, player, hand, policy):
+        upcard = self.dealer.hand.cards[0]
+        while hand.status == 'Live':  # For multiple hits
+            selection = policy(player, hand, hand_options(player, hand), upcard)
+            self.apply(player, hand, selection)
+
+    def play_players(self, policy):
+        for player in self.players:
+            for hand in player.hands:  # Split hands are appended while looping
+                self.play_hand(player, hand, policy)
+
+    def play_round(self, bet_policy, policy, settled=None):
+        # settled(table) runs after settlement while the hands are still there
+        prof = self.__profiler
+        if prof:
+            prof.start('betting')
+        self.start_round([bet_policy(player) for player in self.players])
+        if prof:
+            prof.swap('deal')
+        self.deal()
+        if prof:
+            prof.swap('decisions')
+        self.play_players(policy)
+        if prof:
+            prof.swap('dealer')
+        self.play_dealer()
+        if prof:
+            prof.swap('settle')
+        self.settle()
+        self.settled()
+        if settled:
+            settled(self)
+        if prof:
+            prof.swap('collect')
+        self.collect()
+        if prof:
+            prof.stop()
+
+    @property
+    def profiler(self):
+        return self.__profiler
+
+    @profiler.setter
+    def profiler(self, profiler):
+        # Shared with the deck, which reports its reshuffles
+        self.__profiler = profiler
+        self.deck.profiler = profiler
+
+    def remove_broke(self, minimum=10):
+        broke = [player for player in self.players if not player.have_bal(minimum)]
+        for player in broke:
+            self.players.remove(player)
+        return broke
+
+    def rotate(self):
+        if len(self.players) > 1:
+            self.players = self.players[1:] + self.players[:1]
+
+    def setstate(self, state):
+        # New Player objects replace the seated ones
+        def load_hand(hand_state):
+            count, bet, stake, codes, status, doubled = hand_state
+            hand = Hand(stake, count)
+            for code in codes:
+                hand.add_card(CARDS[code])
+            hand.bet, hand.status, hand.doubled = bet, status, doubled
+            return hand
+
+        self.rounds, self.__start, self.__actions, deck, dealer, players = state
+        self.deck.setstate(deck)
+        self.dealer.hand = None if dealer is None else load_hand(dealer)
+        self.players = []
+        for name, balance, hands in players:
+            player = Player(name, balance)
+            player.hands.extend(map(load_hand, hands))
+            self.players.append(player)
+
+    def settle(self):
+        dealer_hand = self.dealer.hand
+        if dealer_hand.value > 21:  # Dealer Busts
+            for player in self.players:
+                for hand in player.hands:
+                    if hand.value < 22:  # Filtering Non-Bust
+                        if hand.status == 'BlackJack':
+                            hand.bet = round(hand.bet * 2.5)
+                        elif hand.status != 'Surrender':
+                            hand.status = 'Win'
+                            hand.bet *= 2
+        else:  # Dealer not Busts
+            dealer_value = dealer_hand.value
+            dealer_bj = dealer_hand.status == 'BlackJack'
+            for player in self.players:
+                for hand in player.hands:
+                    # Filtering Non-Bust and Non-Surrender
+                    if hand.value < 22 and hand.status != 'Surrender':
+                        if hand.value > dealer_value:
+                            if hand.status == 'BlackJack':
+                                hand.bet = round(hand.bet * 2.5)
+                            else:
+                                hand.status = 'Win'
+                                hand.bet *= 2
+                            dealer_hand.status = '-'
+                        elif hand.value == dealer_value:
+                            if hand.status == 'BlackJack' and not dealer_bj:
+                                hand.bet = round(hand.bet * 2.5)
+                                dealer_hand.status = '-'
+                            elif hand.status != 'BlackJack' and dealer_bj:
+                                hand.status = 'Lost'
+                                hand.bet = 0
+                            else:
+                                hand.status = 'Push'
+                                dealer_hand.status = '-'
+                        else:
+                            hand.status = 'Lost'
+                            hand.bet = 0
+
+            if dealer_hand.status != '-':
+                dealer_hand.status = 'Win'
+
+    def settled(self):
+        # Called once the round is settled and before collect
+        if self.history is not None:
+            self.history.record(self, *self.__start, self.__actions)
+        if self.stats is not None:
+            self.stats.record(self)
+
+    def start_round(self, bets):
+        self.deck.new_round()
+        self.rounds += 1
+        self.__start = self.deck.position, self.deck.shuffles, bets
+        self.__actions = ''
+        self.dealer.add_hand()
+        for player, bet in zip(self.players, bets):
+            player.add_hand(bet)
+
+    def unseen(self):
+        """Deck.unseen counts of the round, with the dealer's hole card while it is dealt."""
+        hand = self.dealer.hand
+        return self.deck.unseen([card.code for card in hand.cards[1:2]] if hand else ())
+
+
+class SeatTable:
+    """
+    Table for large simulations as a struct of arrays. Seat i holds up
+    to HANDS hands in slots i * HANDS on, the dealer hand is the last slot,
+    and every column is a fixed capacity array reused each round, so no
+    object is made per seat, hand or card. Rounds follow the Table rules
+    and deal order card for card, decisions come from a Strategy table.
+    Statuses are STATUS_CODE codes.
+    """
+    __slots__ = ('deck', 'strategy', 'seats', 'rounds', 'balances', 'counts', 'bets', 'stakes',
+                 'values', 'statuses', 'ncards', 'codes', '__hard', '__aces', '__pairs')
+
+    HANDS = 4  # Per seat, as split allows
+    CARDS = 22  # Per hand, 21 aces and the bust card
+
+    def __init__(self, seats, balance=1000, deck_count=1, deck=None, strategy=None):
+        if balance < 0:
+            raise ValueError('Balance should not be negative.')
+
+        slots = seats * self.HANDS + 1
+        self.deck = Deck(deck_count) if deck is None else deck
+        self.strategy = strategy  # load_strategy for the deck's count when None
+        self.seats = seats
+        self.rounds = 0
+        self.balances = _array('q', [balance]) * seats
+        self.counts = _array('B', [0]) * seats  # Hands in play per seat
+        self.bets = _array('q', [0]) * slots  # As Hand.bet and Hand.stake
+        self.stakes = _array('q', [0]) * slots
+        self.values = _array('B', [0]) * slots
+        self.statuses = _array('B', [0]) * slots
+        self.ncards = _array('B', [0]) * slots
+        self.codes = _array('b', [0]) * (slots * self.CARDS)  # Dealt codes, CARDS per slot
+        self.__hard = _array('B', [0]) * slots  # Total with every ace counted as 1
+        self.__aces = _array('B', [0]) * slots
+        self.__pairs = _array('B', [0]) * slots
+
+    def __add_card(self, slot, code):
+        # Hand.add_card on a slot
+        count = self.ncards[slot]
+        self.codes[slot * self.CARDS + count] = code
+        self.ncards[slot] = count = count + 1
+        value = _CARD_VALUE[code]
+        if value == 11:
+            self.__aces[slot] += 1
+            value = 1
+        hard = self.__hard[slot] + value
+        self.__hard[slot] = hard
+        total = hard + 10 if self.__aces[slot] and hard < 12 else hard
+        self.values[slot] = total
+        first = self.codes[slot * self.CARDS]
+        self.__pairs[slot] = _CARD_VALUE[first] if count == 2 \
+            and _CARD_VALUE[first] == _CARD_VALUE[code] else 0
+        if count == 2 and total == 21:
+            self.statuses[slot] = _BLACKJACK
+        elif total > 21:
+            self.statuses[slot] = _BUST
+            self.bets[slot] = 0
+
+    def __new_hand(self, slot, bet):
+        self.bets[slot] = self.stakes[slot] = bet
+        self.values[slot] = self.statuses[slot] = self.ncards[slot] = 0
+        self.__hard[slot] = self.__aces[slot] = self.__pairs[slot] = 0
+
+    def __split_slots(self):
+        # Slots of the hands split off, the seats' first hands are slots 0, HANDS, ...
+        return [seat * self.HANDS + hand for seat, count in enumerate(self.counts) if count > 1
+                for hand in range(1, count)]
+
+    def __split(self, seat, slot, card1, card2):
+        # split on a slot, the second card moves to the seat's next hand
+        count = self.ncards[slot] - 1
+        code = self.codes[slot * self.CARDS + count]
+        self.ncards[slot] = count
+        value = _CARD_VALUE[code]
+        if value == 11:
+            self.__aces[slot] -= 1
+            value = 1
+        hard = self.__hard[slot] - value
+        self.__hard[slot] = hard
+        self.values[slot] = hard + 10 if self.__aces[slot] and hard < 12 else hard
+        self.__pairs[slot] = 0
+
+        new = seat * self.HANDS + self.counts[seat]
+        self.counts[seat] += 1
+        self.balances[seat] -= self.bets[slot]
+        self.__new_hand(new, self.bets[slot])
+        self.__add_card(new, code)
+        self.__add_card(slot, card1)
+        self.__add_card(new, card2)
+
+    @property
+    def dealer(self):
+        """Slot of the dealer hand."""
+        return self.seats * self.HANDS
+
+    def collect(self):
+        # Every hand's cards back to the shoe in one return, in Table.collect order
+        codes, ncards, size = self.codes, self.ncards, self.CARDS
+        dealer = self.dealer
+        balances = self.balances
+        balances[:] = _array('q', [balance + bet for balance, bet
+                                   in zip(balances, self.bets[0:dealer:self.HANDS])])
+        for slot in self.__split_slots():
+            balances[slot // self.HANDS] += self.bets[slot]
+        returned = codes[dealer * size:dealer * size + ncards[dealer]]
+        for seat, count in enumerate(self.counts):
+            base = seat * self.HANDS
+            for slot in range(base, base + count):
+                returned += codes[slot * size:slot * size + ncards[slot]]
+        self.counts[:] = _array('B', [0]) * self.seats
+        self.deck.return_codes(returned)
+
+    def deal(self):
+        # Table.deal order, the seats' first hands are filled a column at a time
+        seats, dealer = self.seats, self.dealer
+        dealt = self.deck.deal(2 * seats + 2)
+        self.__add_card(dealer, dealt[0])
+        self.__add_card(dealer, dealt[seats + 1])
+        first, second = dealt[1:seats + 1], dealt[seats + 2:]
+        keys = [_CARD_VALUE[one] * 12 + _CARD_VALUE[two] for one, two in zip(first, second)]
+        hands = slice(0, seats * self.HANDS, self.HANDS)
+        self.codes[0:dealer * self.CARDS:self.HANDS * self.CARDS] = first
+        self.codes[1:dealer * self.CARDS:self.HANDS * self.CARDS] = second
+        self.ncards[hands] = _array('B', [2]) * seats
+        for column, table in zip((self.values, self.__hard, self.__aces, self.__pairs,
+                                  self.statuses), _TWO_CARDS):
+            column[hands] = _array('B', map(table.__getitem__, keys))
+
+    def play_dealer(self):
+        dealer = self.dealer
+        values = self.values
+        hand_values = [value for value in values[0:dealer:self.HANDS] if value < 22]
+        hand_values += [values[slot] for slot in self.__split_slots() if values[slot] < 22]
+        player_max = max(hand_values, default=0)
+        if player_max:  # Checking if dealer needs to play
+            get_code = self.deck.get_code
+            while values[dealer] < 18 and values[dealer] < player_max:
+                self.__add_card(dealer, get_code())
+            if self.statuses[dealer] == _LIVE:
+                self.statuses[dealer] = _STAND
+        else:
+            self.statuses[dealer] = STATUS_CODE['Win']
+
+    def play_players(self):
+        # Table.play_players with StrategyPolicy, hand_options as a Strategy.MASK mask
+        table = (self.strategy or _strategies.get(self.deck.count)
+                 or load_strategy(rules=self.deck.count)).table
+        get_code = self.deck.get_code
+        balances, counts, bets, stakes = self.balances, self.counts, self.bets, self.stakes
+        values, statuses, ncards, hard, pairs = (self.values, self.statuses, self.ncards,
+                                                 self.__hard, self.__pairs)
+        up = (_CARD_VALUE[self.codes[self.dealer * self.CARDS]] - 2) * 8
+        for seat in range(self.seats):
+            slot = seat * self.HANDS
+            while slot < seat * self.HANDS + counts[seat]:  # Split hands are added while looping
+                while statuses[slot] == _LIVE:
+                    bet = bets[slot]
+                    afford = 0 < bet <= balances[seat]
+                    first = ncards[slot] == 2 and counts[seat] == 1
+                    mask = (first and afford) | (pairs[slot] and counts[seat] < 4 and afford) << 1 \
+                        | first << 2
+                    value = values[slot]
+                    state = value | (value != hard[slot]) << 5 | pairs[slot] << 6
+                    option = table[state * 80 + up + mask]
+                    if option == 0:  # H
+                        self.__add_card(slot, get_code())
+                    elif option == 1:  # S
+                        statuses[slot] = _STAND
+                    elif option == 2:  # D
+                        balances[seat] -= bet
+                        bets[slot] = stakes[slot] = bet + bet
+                        statuses[slot] = _DOUBLE
+                        self.__add_card(slot, get_code())
+                    elif option == 3:  # L
+                        card1 = get_code()
+                        self.__split(seat, slot, card1, get_code())
+                    else:  # R
+                        bets[slot] //= 2
+                        statuses[slot] = _SURRENDER
+                slot += 1
+
+    def play_round(self, bets, settled=None):
+        # settled(table) runs after settlement while the hands are still there
+        self.start_round(bets)
+        self.deal()
+        self.play_players()
+        self.play_dealer()
+        self.settle()
+        if settled:
+            settled(self)
+        self.collect()
+
+    @property
+    def seat_bytes(self):
+        """Bytes of table state per seat, the dealer's share included."""
+        columns = (self.balances, self.counts, self.bets, self.stakes, self.values,
+                   self.statuses, self.ncards, self.codes, self.__hard, self.__aces, self.__pairs)
+        per_seat = sum(column.itemsize * len(column) for column in columns)
+        return per_seat / self.seats if self.seats else 0
+
+    def settle(self):
+        # Table.settle through the settle_outcomes lookup, a column at a time
+        dealer = self.dealer
+        outcomes = settle_outcomes()[min(self.values[dealer], 22) * 2
+                                     + (self.statuses[dealer] == _BLACKJACK)]
+        bets, values, statuses = self.bets, self.values, self.statuses
+        hands = slice(0, dealer, self.HANDS)
+        settled = [outcomes[status][value] for status, value in zip(statuses[hands], values[hands])]
+        statuses[hands] = _array('B', [status for status, _ in settled])
+        bets[hands] = _array('q', [round(bet * payout)
+                                   for bet, (_, payout) in zip(bets[hands], settled)])
+        for slot in self.__split_slots():
+            statuses[slot], payout = outcomes[statuses[slot]][values[slot]]
+            bets[slot] = round(bets[slot] * payout)
+
+    def start_round(self, bets):
+        # One bet per seat, the hands are filled in by deal
+        if len(bets) != self.seats:
+            raise ValueError('One bet per seat needed.')
+        balances = _array('q', [balance - bet for balance, bet in zip(self.balances, bets)])
+        if bets and (min(bets) <= 0 or min(balances) < 0):  # For debug purpose
+            raise ValueError('Bet not enough.')
+        self.deck.new_round()
+        self.rounds += 1
+        self.__new_hand(self.dealer, 0)
+        self.balances[:] = balances
+        self.counts[:] = _array('B', [1]) * self.seats
+        hands = slice(0, self.seats * self.HANDS, self.HANDS)
+        self.bets[hands] = self.stakes[hands] = _array('q', bets)
+
+
+class Strategy:
+    """
+    Basic strategy lookup table, one decision byte per
+    (Hand.state, dealer upcard value, allowed options mask), built for
+    rules, the number of decks in the shoe.
+    """
+    __slots__ = 'rules', 'table'
+
+    MAGIC = b'BJST'
+    OPTIONS = 'HSDLR'
+    UPCARDS = 10  # Upcard values 2 - 11
+    MASKS = 8  # D, L, R bits
+    # hand_options lists always come in H, S, D, L, R order
+    MASK = {('H', 'S'): 0, ('H', 'S', 'D'): 1, ('H', 'S', 'L'): 2, ('H', 'S', 'D', 'L'): 3,
+            ('H', 'S', 'R'): 4, ('H', 'S', 'D', 'R'): 5, ('H', 'S', 'L', 'R'): 6,
+            ('H', 'S', 'D', 'L', 'R'): 7}
+
+    def __init__(self, table, rules=STRATEGY_DECKS):
+        if len(table) != HAND_STATES * self.UPCARDS * self.MASKS:
+            raise ValueError('Invalid strategy table size')
+        self.rules = rules
+        self.table = table
+
+    @classmethod
+    def build(cls, rules=STRATEGY_DECKS):
+        """
+        Generates the table for a shoe of rules decks. Each entry is the
+        allowed option of best option_ev on the full shoe, so the dealer
+        draws as in Table.play_dealer, splits are valued as the first one.
+        """
+        if rules < 1:
+            raise ValueError('Atleast 1 deck needed to play')
+        comp = (4 * rules,) * 9 + (16 * rules,)  # A - 9 and the 10 valued cards
+        table = bytearray(HAND_STATES * cls.UPCARDS * cls.MASKS)
+        for up in range(2, 12):
+            evs = _option_evs(up, comp)
+            for state in range(HAND_STATES):
+                value, soft, pair = state & 31, state >> 5 & 1, state >> 6
+                hard = value - 10 * soft
+                base = (state * cls.UPCARDS + up - 2) * cls.MASKS
+                if value > 21 or hard < 2 or soft and hard > 11:  # Never a live hand
+                    table[base:base + cls.MASKS] = b'\1' * cls.MASKS
+                    continue
+                ev = evs(hard, soft, pair, False, 1, 'HSDLR' if pair else 'HSDR')
+                for mask in range(cls.MASKS):
+                    allowed = 'HS' + 'D' * (mask & 1) + 'L' * (mask >> 1 & bool(pair)) \
+                        + 'R' * (mask >> 2)
+                    table[base + mask] = cls.OPTIONS.index(max(allowed, key=ev.get))
+        return cls(bytes(table), rules)
+
+    def decide(self, hand, upcard, op_lst):
+        index = (hand.state * 10 + upcard.value - 2) * 8 + self.MASK[tuple(op_lst)]
+        return self.OPTIONS[self.table[index]]
+
+    @classmethod
+    def load(cls, path, rules=None):
+        """Reads a saved table, refused unless built for rules when given."""
+        with open(path, 'rb') as file:
+            data = file.read()
+        if data[:4] != cls.MAGIC:
+            raise ValueError('Not a strategy file')
+        saved = int.from_bytes(data[4:6], 'little')
+        if rules is not None and saved != rules:
+            raise ValueError(f'Strategy file is for {saved} decks, not {rules}')
+        return cls(data[6:], saved)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(self.MAGIC + self.rules.to_bytes(2, 'little') + self.table)
+
+
+# One file per rule set, {rules} is the number of decks
+STRATEGY_PATH = _os.path.join(_os.path.dirname(_os.path.abspath(__file__)), 'strategy-{rules}.bin')
+_strategies = {}  # Loaded tables by rules
+
+
+def load_strategy(path=STRATEGY_PATH, rules=STRATEGY_DECKS):
+    """
+    Loads the strategy table for rules decks on its first use, from path
+    with {rules} filled in, building and saving it if missing or built
+    for other rules. Later calls for the same rules return that table.
+    """
+    strategy = _strategies.get(rules)
+    if strategy is None:
+        path = path.format(rules=rules)
+        try:
+            strategy = Strategy.load(path, rules)
+        except (OSError, ValueError):
+            strategy = Strategy.build(rules)
+            try:
+                strategy.save(path)
+            except OSError:  # Read only install, keep it in memory
+                pass
+        _strategies[rules] = strategy
+    return strategy
+
+
+class Profiler:
+    """
+    Optional instrumentation of the round phases, set as Table.profiler.
+    Records calls and wall time per phase, plus net bytes allocated when
+    created with allocations=True (uses tracemalloc, much slower). Phases
+    can nest, self time leaves out the time of the phases inside.
+    """
+    __slots__ = 'allocations', 'phases', '__stack'
+
+    FIELDS = 'phase', 'calls', 'seconds', 'alloc_bytes', 'self_seconds'
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        self.phases = {}  # Phase -> [calls, nanoseconds, bytes, self nanoseconds]
+        self.__stack = []  # Phases can nest, render runs inside decisions
+        if allocations:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def __memory(self):
+        import tracemalloc
+        return tracemalloc.get_traced_memory()[0]
+
+    def merge(self, phases):
+        """Adds the phases dict of another Profiler, such as a simulate shard."""
+        for phase, record in phases.items():
+            own = self.phases.setdefault(phase, [0, 0, 0, 0])
+            for i, value in enumerate(record):
+                own[i] += value
+
+    def rows(self):
+        return [(phase, calls, nanos / 1e9, alloc, own / 1e9)
+                for phase, (calls, nanos, alloc, own) in self.phases.items()]
+
+    def start(self, phase):
+        memory = self.__memory() if self.allocations else 0
+        self.__stack.append([phase, _tm.perf_counter_ns(), memory, 0])  # 0: nested time
+
+    def stop(self):
+        end = _tm.perf_counter_ns()
+        phase, start, memory, nested = self.__stack.pop()
+        elapsed = end - start
+        if self.__stack:  # Taken out of the self time of the enclosing phase
+            self.__stack[-1][3] += elapsed
+        record = self.phases.setdefault(phase, [0, 0, 0, 0])
+        record[0] += 1
+        record[1] += elapsed
+        record[3] += elapsed - nested
+        if self.allocations:
+            record[2] += self.__memory() - memory
+
+    def summary(self):
+        # Self times, so nested phases are counted once and the shares add up to 100%
+        total = sum(record[3] for record in self.phases.values()) or 1
+        return ' | '.join(f'{phase} {own / 1e6:.1f}ms {own / total:.0%}'
+                          for phase, (_, _, _, own) in self.phases.items())
+
+    def swap(self, phase):
+        self.stop()
+        self.start(phase)
+
+    def write(self, path):
+        """Writes the records as CSV when path ends with .csv, else as JSON."""
+        with open(path, 'w', newline='') as file:
+            if path.endswith('.csv'):
+                import csv
+                writer = csv.writer(file)
+                writer.writerow(self.FIELDS)
+                writer.writerows(self.rows())
+            else:
+                import json
+                json.dump([dict(zip(self.FIELDS, row)) for row in self.rows()], file, indent=2)
+
+
+class RunStats:
+    """
+    Constant memory results of a run, set as Table.stats to take every
+    settled round. Hands are summed per GROUPS entry as exact integer
+    count, net, squared net and stake sums, so the mean and variance are
+    exact and merging partial runs, such as simulate shards, gives the
+    same result in any order. The running net of each player after every
+    round is counted in a histogram of bins fixed bins, bin_width wide
+    around 0 and clamped at both ends, for the bankroll quantiles.
+    Running nets start at 0 in each RunStats and merge doesn't carry them
+    on, so merged quantiles are over sessions of the merged parts, such
+    as SHARD_ROUNDS rounds in simulate, not over the whole run.
+    """
+    __slots__ = 'rounds', 'statuses', 'groups', 'bin_width', 'histogram', '__running'
+
+    GROUPS = 'hand', 'double', 'split'  # Every hand, doubled hands, hands of a split
+
+    def __init__(self, bin_width=10, bins=2001):
+        self.rounds = 0
+        self.statuses = dict.fromkeys(STATUSES, 0)  # Hands by settled status
+        self.groups = {group: [0, 0, 0, 0] for group in self.GROUPS}  # n, net, net², stake
+        self.bin_width = bin_width
+        self.histogram = _array('Q', [0]) * bins
+        self.__running = {}  # Player name -> net since the first round seen
+
+    def add_hand(self, net, stake, status, group=None):
+        """One settled hand, for engines other than Table."""
+        self.statuses[status] += 1
+        for key in ('hand', group) if group else ('hand',):
+            sums = self.groups[key]
+            sums[0] += 1
+            sums[1] += net
+            sums[2] += net * net
+            sums[3] += stake
+
+    def add_position(self, name, net):
+        """Adds net to the running net of player name, binned once per round."""
+        running = self.__running.get(name, 0) + net
+        self.__running[name] = running
+        histogram = self.histogram
+        index = running // self.bin_width + len(histogram) // 2
+        histogram[min(max(index, 0), len(histogram) - 1)] += 1
+
+    def house_edge(self, z=1.96, group='hand'):
+        """House edge per unit staked and its normal confidence interval, as (edge, low, high)."""
+        count, net, _, stake = self.groups[group]
+        if not stake:
+            return 0.0, 0.0, 0.0
+        edge = -net / stake
+        error = z * (self.variance(group) / count) ** 0.5 * count / stake
+        return edge, edge - error, edge + error
+
+    @property
+    def hands(self):
+        return self.groups['hand'][0]
+
+    def mean(self, group='hand'):
+        """Mean net result per hand."""
+        count, net = self.groups[group][:2]
+        return net / count if count else 0.0
+
+    def merge(self, other):
+        """Adds the totals of another RunStats with the same bins."""
+        if other.bin_width != self.bin_width or len(other.histogram) != len(self.histogram):
+            raise ValueError('RunStats bins differ')
+        self.rounds += other.rounds
+        for status, count in other.statuses.items():
+            self.statuses[status] += count
+        for group, sums in other.groups.items():
+            own = self.groups[group]
+            for i, value in enumerate(sums):
+                own[i] += value
+        self.histogram = _array('Q', map(sum, zip(self.histogram, other.histogram)))
+
+    def quantile(self, q):
+        """Running net per player at quantile q of all rounds, to bin_width."""
+        histogram = self.histogram
+        target = q * sum(histogram)
+        seen = 0
+        for index, count in enumerate(histogram):
+            seen += count
+            if count and seen >= target:
+                return (index - len(histogram) // 2) * self.bin_width
+        return 0
+
+    def rates(self):
+        """Share of hands per settled status."""
+        hands = self.hands or 1
+        return {status: count / hands for status, count in self.statuses.items() if count}
+
+    def record(self, table):
+        # Runs every round from Table.settled, after settlement and before collect
+        self.rounds += 1
+        add_hand = self.add_hand
+        for player in table.players:
+            hands = player.hands
+            split = len(hands) > 1
+            round_net = 0
+            for hand in hands:
+                net = hand.bet - hand.stake
+                round_net += net
+                add_hand(net, hand.stake, hand.status,
+                         'split' if split else 'double' if hand.doubled else None)
+            self.add_position(player.name, round_net)
+
+    def variance(self, group='hand'):
+        """Sample variance of the net result per hand."""
+        count, net, square = self.groups[group][:3]
+        if count < 2:
+            return 0.0
+        return (count * square - net * net) / (count * (count - 1))
+
+
+class HandHistory:
+    """
+    Append only hand history, one fixed width RECORD per settled round:
+    round, shoe position, seats, dealt count, the codes in the order they
+    were dealt, the seat bets, the STATUS_CODE of every hand as settled
+    (HANDS per seat, 0 past the last), the net of every seat and the
+    hand_options letters taken in order.
+    Columns are fixed width, sized for the worst round of SEATS seats:
+    a hand holds at most 22 cards (hard total 21 of ones and a bust card)
+    and takes at most 21 decisions, a seat splits into HANDS hands, the
+    dealer draws at most 18 cards. More than SEATS seats raise ValueError.
+    The header keeps the shoe seed, decks and shuffle mode of deck and the
+    RNG_KINDS rng kind, shard is the rounds played per make_rng stream of
+    the shard index as in simulate, 0 for one.
+    An existing file is only appended to when its header is the same and
+    the new rounds follow on from its last one, else ValueError is raised.
+    """
+    __slots__ = 'path', 'seed', 'rounds', '__file', '__header', '__bets', '__packed_bets'
+
+    MAGIC = b'BJHH'
+    # Magic, version, record size, seed, decks, shard, shuffle mode, penetration, rng kind
+    HEADER = _struct.Struct('<4sHHQHIBdB')
+    SEATS, HANDS = 7, 4  # Seats of the game table, hands of a seat after splits
+    CARDS = SEATS * HANDS * 22 + 18  # Widths of the RECORD columns
+    ACTIONS = SEATS * (HANDS * 21 + HANDS - 1)
+    # Bets are uint32 and nets int64 per seat
+    RECORD = _struct.Struct(f'<QIBxH{CARDS}s{SEATS * 4}s{SEATS * HANDS}s{SEATS * 8}s{ACTIONS}s')
+
+    def __init__(self, path, seed=0, deck=None, shard=0, rng='random'):
+        deck = Deck() if deck is None else deck
+        self.path = path
+        self.seed = seed
+        self.rounds = None  # Round of the last record, None while there is none
+        self.__bets = self.__packed_bets = None  # Bets rarely change between rounds
+        self.__header = self.HEADER.pack(
+            self.MAGIC, 2, self.RECORD.size, seed, deck.count, shard,
+            Deck.MODES.index(deck.shuffle), deck.penetration, RNG_KINDS.index(rng))
+        self.__file = open(path, 'ab', buffering=1 << 20)
+        size = self.__file.tell()
+        if size == 0:
+            self.__file.write(self.__header)
+            return
+        with open(path, 'rb') as file:
+            same = file.read(self.HEADER.size) == self.__header
+        if not same:
+            self.__file.close()
+            raise ValueError('Hand history file is of another seed, shoe or rng')
+        self.__tail(size)
+
+    def __tail(self, size):
+        # Cuts a torn last record off the file, rounds is read from the last whole one
+        records = (size - self.HEADER.size) // self.RECORD.size
+        size = self.HEADER.size + records * self.RECORD.size
+        self.__file.truncate(size)
+        self.__file.seek(size)  # Appends go to the end, tell follows them
+        self.rounds = self.__last_round(self.path, records) if records else None
+
+    @classmethod
+    def results(cls, players):
+        """RECORD statuses and nets columns of the settled hands of players."""
+        statuses = bytearray(len(players) * cls.HANDS)
+        nets = _array('q')
+        for seat, player in enumerate(players):
+            net = 0
+            for index, hand in enumerate(player.hands, seat * cls.HANDS):
+                statuses[index] = STATUS_CODE[hand.status]
+                net += hand.bet - hand.stake
+            nets.append(net)
+        return bytes(statuses), nets.tobytes()
+
+    def __follows(self, rnd):
+        if self.rounds is not None and rnd != self.rounds + 1:
+            raise ValueError(f'Round {rnd} does not follow round {self.rounds} '
+                             f'of the hand history file')
+
+    def __last_round(self, path, records):
+        with open(path, 'rb') as file:
+            file.seek(self.HEADER.size + (records - 1) * self.RECORD.size)
+            return self.RECORD.unpack(file.read(self.RECORD.size))[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.__file.close()
+
+    def flush(self):
+        self.__file.flush()
+
+    def tell(self):
+        return self.__file.tell()
+
+    def truncate(self, size):
+        """Drops the records written after size bytes, as when resuming a Checkpoint."""
+        self.__file.flush()
+        if self.__file.tell() < size:
+            raise ValueError('Hand history is shorter than the checkpoint')
+        self.__tail(size)
+
+    def merge(self, path):
+        """Appends the records of the history file at path, then deletes it."""
+        with open(path, 'rb') as file:
+            if file.read(self.HEADER.size) != self.__header:
+                raise ValueError('Hand history file is of another seed, shoe or rng')
+            records = (_os.fstat(file.fileno()).st_size - self.HEADER.size) // self.RECORD.size
+            if records:
+                first = self.RECORD.unpack(file.read(self.RECORD.size))[0]
+                self.__follows(first)
+                file.seek(self.HEADER.size)
+                left = records * self.RECORD.size  # Whole records only
+                while left:
+                    chunk = file.read(min(left, 1 << 20))
+                    self.__file.write(chunk)
+                    left -= len(chunk)
+                self.rounds = self.__last_round(path, records)
+        _os.remove(path)
+
+    def record(self, table, start, shuffles, bets, actions):
+        # Runs every simulated round, only results loops over hands
+        if self.rounds is not None and table.rounds != self.rounds + 1:
+            self.__follows(table.rounds)
+        self.rounds = table.rounds
+        if bets != self.__bets:
+            self.__bets = bets
+            self.__packed_bets = _array('I', bets).tobytes()
+        if len(bets) > self.SEATS:
+            raise ValueError(f'A hand history holds upto {self.SEATS} seats')
+        dealt = table.deck.dealt(start, shuffles)
+        statuses, nets = self.results(table.players)
+        self.__file.write(self.RECORD.pack(table.rounds, start, len(bets), len(dealt), dealt,
+                                           self.__packed_bets, statuses, nets, actions.encode()))
+
+
+class HistoryReader:
+    """
+    Memory maps a HandHistory file, records are unpacked only when read,
+    so files larger than memory can be scanned. Records are tuples of
+    (round, position, seats, dealt count, dealt, bets, statuses, nets,
+    actions), as in HandHistory.RECORD.
+    """
+    __slots__ = ('seed', 'decks', 'shard', 'shuffle', 'penetration', 'rng', '__file', '__map',
+                 '__view', '__count', '__table')
+
+    def __init__(self, path):
+        import mmap
+        self.__file = open(path, 'rb')
+        try:
+            self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self.__file.close()
+            raise ValueError('Not a hand history file')
+        self.__view = None
+        if len(self.__map) < HandHistory.HEADER.size \
+                or self.__map[:4] != HandHistory.MAGIC:  # Checked before any field is used
+            self.close()
+            raise ValueError('Not a hand history file')
+        _, _, size, self.seed, self.decks, self.shard, mode, self.penetration, rng = \
+            HandHistory.HEADER.unpack_from(self.__map)
+        if size != HandHistory.RECORD.size or mode >= len(Deck.MODES) or rng >= len(RNG_KINDS):
+            self.close()
+            raise ValueError('Not a hand history file')
+        self.shuffle = Deck.MODES[mode]
+        self.rng = RNG_KINDS[rng]
+        start = HandHistory.HEADER.size
+        self.__count = (len(self.__map) - start) // size  # Ignores a torn last record
+        self.__view = memoryview(self.__map)[start:start + self.__count * size]
+        self.__table = Table([])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getitem__(self, index):
+        if not -self.__count <= index < self.__count:
+            raise IndexError('record index out of range')
+        return HandHistory.RECORD.unpack_from(self.__view, (index % self.__count)
+                                              * HandHistory.RECORD.size)
+
+    def __iter__(self):
+        return HandHistory.RECORD.iter_unpack(self.__view)
+
+    def __len__(self):
+        return self.__count
+
+    def close(self):
+        if self.__view is not None:
+            self.__view.release()
+            self.__view = None
+        self.__map.close()
+        self.__file.close()
+
+    def hands(self, record):
+        """
+        Replays a record on the engine, returns the dealer codes and a
+        (round, seat, count, status, codes, stake, payout, actions) per hand.
+        ValueError is raised when the replayed statuses or nets differ from
+        the recorded ones, as after a change of the settle code.
+        """
+        rnd, _, seats, ndealt, dealt, bets, statuses, nets, actions = record
+        table = self.__table
+        players = table.players  # Seats are reused across records
+        while len(players) < seats:
+            players.append(Player(len(players)))
+        del players[seats:]
+        for player in players:
+            player.clear_hands()
+            player.balance = 1 << 62
+        table.deck.load(dealt[:ndealt])
+        table.start_round(_array('I', bets)[:seats])
+        table.deal()
+        moves = iter(actions.rstrip(b'\0').decode())
+        taken = {}
+
+        def replay(player, hand, op_lst, upcard):
+            selection = next(moves, None)
+            if selection is None:  # For debug purpose
+                raise ValueError(f'Round {rnd} record ran out of decisions')
+            taken[hand] = taken.get(hand, '') + selection
+            return selection
+
+        table.play_players(replay)
+        table.play_dealer()
+        table.settle()
+        if HandHistory.results(players) != (statuses[:seats * HandHistory.HANDS],
+                                            nets[:seats * 8]):
+            raise ValueError(f'Round {rnd} settles other than recorded')
+        return (bytes([card.code for card in table.dealer.hand.cards]),
+                [(rnd, player.name, hand.count, hand.status,
+                  bytes([card.code for card in hand.cards]), hand.stake, hand.bet,
+                  taken.get(hand, '')) for player in table.players for hand in player.hands])
+
+    def query(self, status=None, seat=None, start=0, stop=None):
+        """Hands of rounds start to stop, filtered by status name and seat."""
+        code = None if status is None else STATUS_CODE[status]
+        for record in self:
+            if record[0] < start:
+                continue
+            if stop is not None and record[0] >= stop:
+                break  # Rounds are appended in order
+            if seat is not None and seat >= record[2]:
+                continue
+            if code is not None and code not in (record[6] if seat is None else record[6][
+                    seat * HandHistory.HANDS:(seat + 1) * HandHistory.HANDS]):
+                continue  # Recorded statuses skip replaying rounds without a match
+            for hand in self.hands(record)[1]:
+                if (status is None or hand[3] == status) and (seat is None or hand[1] == seat):
+                    yield hand
+
+    def replay(self, start=1, stop=None, settled=None):
+        """
+        Rebuilds rounds start to stop from the seed, bets and decisions only,
+        earlier rounds are fast-forwarded on the shoe without being played
+        (played unreported in 'csm', where the return order moves the shoe).
+        Every rebuilt round is checked against the recorded cards and
+        settlement and goes to settled(table) before collect. Returns the last Replay used.
+        """
+        replay = stream = None
+        for record in self:
+            rnd, position, seats, ndealt, dealt, bets, statuses, nets, actions = record
+            if stop is not None and rnd > stop:
+                break  # Rounds are appended in order
+            index = (rnd - 1) // self.shard if self.shard else 0
+            if index != stream:  # simulate shards each start a new shoe
+                stream = index
+                replay = Replay(self.seed, self.decks, self.shuffle, self.penetration,
+                                rng=self.rng, stream=index if self.shard else None)
+                replay.table.rounds = rnd - 1
+            replay.table.deck.new_round()
+            if replay.table.deck.position != position:
+                raise Exception(f'Replay diverged before round {rnd}')
+            if rnd < start and self.shuffle != 'csm':
+                replay.skip(ndealt)
+            else:  # A csm shoe takes the cards back in collect order, only play has it
+                replay.play(_array('I', bets)[:seats], actions.rstrip(b'\0').decode(),
+                            dealt[:ndealt], settled if rnd >= start else None,
+                            (statuses[:seats * HandHistory.HANDS], nets[:seats * 8]))
+        return replay
+
+
+class Replay:
+    """
+    Rebuilds rounds from a shoe seed and the recorded bets and decisions,
+    on the same Table, Deck and play rule code paths as live play.
+    Players are seats, each with its own balance from balance on.
+    rng and stream pick the shoe's make_rng stream of seed.
+    """
+    __slots__ = 'table', '__seats', '__balance'
+
+    def __init__(self, seed, decks=1, shuffle='empty', penetration=0.75, balance=1 << 62,
+                 rng='random', stream=None):
+        self.table = Table([], deck=Deck(decks, make_rng(seed, rng, stream), shuffle, penetration))
+        self.__seats = []
+        self.__balance = balance
+
+    def play(self, bets, actions, dealt=None, settled=None, results=None):
+        """
+        Plays one round, dealt codes are checked against the shoe and
+        results, the HandHistory.results columns, against the settled
+        hands when given.
+        """
+        table = self.table
+        deck = table.deck
+        seats = self.__seats
+        while len(seats) < len(bets):
+            seats.append(Player(len(seats), self.__balance))
+        table.players = seats[:len(bets)]
+        start, shuffles = deck.position, deck.shuffles
+        bets = iter(bets)
+        moves = iter(actions)
+
+        def bet_policy(player):
+            return next(bets)
+
+        def policy(player, hand, op_lst, upcard):
+            selection = next(moves, None)
+            if selection is None:  # For debug purpose
+                raise Exception(f'Decisions ran out in round {table.rounds}')
+            return selection
+
+        def check(table):
+            if next(moves, None) is not None or \
+                    dealt is not None and deck.dealt(start, shuffles) != dealt:
+                raise Exception(f'Replay diverged in round {table.rounds}')
+            if results is not None and HandHistory.results(table.players) != results:
+                raise ValueError(f'Round {table.rounds} settles other than recorded')
+            if settled:
+                settled(table)
+
+        table.play_round(bet_policy, policy, check)
+
+    def skip(self, dealt):
+        """Fast-forwards a round that dealt that many cards, without playing it."""
+        deck = self.table.deck
+        deck.new_round()
+        deck.return_codes(deck.deal(dealt))
+        self.table.rounds += 1
+
+
+class Checkpoint:
+    """
+    Snapshot file of a running table for resuming after the process is
+    stopped: Table.getstate, the Table.stats RunStats, the HandHistory
+    length and the UserInterface round and deck counts. save takes the
+    snapshot in place and a background thread writes it to a temporary
+    file renamed over path, so path always holds a whole snapshot. load
+    puts it back, the run then goes on exactly as the saved one would.
+    key is any picklable value naming the run, a snapshot of another run
+    is refused.
+    """
+    __slots__ = 'path', 'key', '__thread'
+
+    MAGIC = b'BJCP'
+    HEADER = _struct.Struct('<4sHI')  # Magic, version, pickled payload size
+
+    def __init__(self, path, key=None):
+        self.path = path
+        self.key = key
+        self.__thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __write(self, data):
+        temp = f'{self.path}.tmp'
+        with open(temp, 'wb') as file:
+            file.write(data)
+            file.flush()
+            _os.fsync(file.fileno())
+        _os.replace(temp, self.path)
+
+    def close(self):
+        self.wait()
+
+    def dumps(self, table, ui=None):
+        """Snapshot of table and ui as bytes."""
+        import pickle
+        history = None
+        if table.history is not None:
+            table.history.flush()  # Records up to the snapshot are on disk before it
+            history = table.history.tell()
+        counts = None if ui is None else (ui.round_count, ui.deck_count)
+        payload = pickle.dumps((self.key, table.getstate(), table.stats, history, counts),
+                               pickle.HIGHEST_PROTOCOL)
+        return self.HEADER.pack(self.MAGIC, 1, len(payload)) + payload
+
+    def load(self, table, ui=None):
+        """Restores table and ui from path, False when there is no snapshot yet."""
+        import pickle
+        self.wait()
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return False
+        if len(data) < self.HEADER.size or data[:4] != self.MAGIC:  # Checked before unpacking
+            raise ValueError('Not a checkpoint file')
+        _, _, size = self.HEADER.unpack_from(data)
+        if size != len(data) - self.HEADER.size:
+            raise ValueError('Not a checkpoint file')
+        saved, state, stats, history, counts = pickle.loads(data[self.HEADER.size:])
+        if saved != self.key:
+            raise ValueError('Checkpoint is of another run')
+        table.setstate(state)
+        table.stats = stats
+        if table.history is not None and history is not None:
+            table.history.truncate(history)
+        if ui is not None and counts is not None:
+            ui.round_count, ui.deck_count = counts
+        return True
+
+    def remove(self):
+        """Deletes the snapshot, once the run it is for has ended."""
+        self.wait()
+        if _os.path.exists(self.path):
+            _os.remove(self.path)
+
+    def save(self, table, ui=None):
+        """Snapshots table and ui, written to path in the background."""
+        import threading
+        data = self.dumps(table, ui)
+        self.wait()  # One write at a time, the newest snapshot is renamed last
+        self.__thread = threading.Thread(target=self.__write, args=(data,))
+        self.__thread.start()
+
+    def wait(self):
+        """Blocks until the last save is on disk."""
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+
+@_lru_cache(maxsize=None)
+def _align_art(string, width):
+    # string centred under a width wide title, built once per art and width
+    if len(string) == 0 or width == 0:
+        raise ValueError('title or given string have 0 length')
+
+    if not string.startswith('\n'):
+        string = '\n' + string
+
+    string_split = string.splitlines()
+    string_max = max(map(len, string_split))
+
+    filler = '\n' + ' ' * (abs(width - string_max) // 2)
+    return filler.join(string_split)
 
 
 class UserInterface:
-    __slots__ = ('__title_art', '__title_max_len', '__rule_art', '__lines',
-                 'round_count', 'deck_count')
+    __slots__ = ('__title_art', '__title_max_len', '__rule_art', '__lines', '__frame',
+                 '__frame_end', '__skip', '__out', 'bytes_out', 'writes', 'pace', 'reader',
+                 'writer', 'round_count', 'deck_count')
 
     # ASCII Escape Sequences
     ERASE_LINE = '\x1b[2K'
@@ -174,120 +1772,97 @@ class UserInterface:
     CARRIAGE_RETURN = '\x0D'
 
     # Color Configuration for entire game
-    F_RESET = colorama.Fore.RESET
+    F_RESET = _Fore.RESET
     COLOR = {
-        'BAR': colorama.Fore.BLUE,
-        'Live': colorama.Fore.CYAN,
-        'BlackJack': colorama.Fore.GREEN,
-        'Bust': colorama.Fore.RED,
-        'Stand': colorama.Fore.YELLOW,
-        'Double': colorama.Fore.MAGENTA,
-        'Surrender': colorama.Fore.RED,
-        'Win': colorama.Fore.GREEN,
-        'Lost': colorama.Fore.RED,
-        '-': colorama.Fore.CYAN,
-        'Push': colorama.Fore.BLUE,
-        'H': colorama.Fore.GREEN,
-        'S': colorama.Fore.YELLOW,
-        'D': colorama.Fore.MAGENTA,
-        'L': colorama.Fore.BLUE,
-        'R': colorama.Fore.RED,
+        'BAR': _Fore.BLUE,
+        'Live': _Fore.CYAN,
+        'BlackJack': _Fore.GREEN,
+        'Bust': _Fore.RED,
+        'Stand': _Fore.YELLOW,
+        'Double': _Fore.MAGENTA,
+        'Surrender': _Fore.RED,
+        'Win': _Fore.GREEN,
+        'Lost': _Fore.RED,
+        '-': _Fore.CYAN,
+        'Push': _Fore.BLUE,
+        'H': _Fore.GREEN,
+        'S': _Fore.YELLOW,
+        'D': _Fore.MAGENTA,
+        'L': _Fore.BLUE,
+        'R': _Fore.RED,
     }
     VB = f"{COLOR['BAR']}|{F_RESET}"
 
-    def __init__(self, title_art='', rule_art=''):
+    def __init__(self, title_art='', rule_art='', pace=1.0, reader=None, writer=None):
         self.__title_art = title_art
         self.__title_max_len = max(map(len, title_art.splitlines()))
         self.__rule_art = self.__align_w_title(rule_art)
         self.__lines = 0
+        self.__frame = None  # Lines of the last print_stats frame still on screen
+        self.__frame_end = 0  # Line count right after that frame
+        self.__skip = None  # Event of the running countdown, made on the loop running it
+        self.__out = []  # Writes of the screen update being drawn, see flush
+        self.bytes_out = 0
+        self.writes = 0  # writer calls, one per flushed screen update
+        self.pace = pace  # Seconds per countdown tick, 0 for no waiting
+        self.reader = _read_stdin if reader is None else reader  # Awaitable line source
+        self.writer = _write_stdout if writer is None else writer
         self.round_count = 0
         self.deck_count = 0
 
-        self.print(colorama.Style.BRIGHT)
-        self.clear()
-
     def __align_w_title(self, string):
-        if len(string) == 0 or self.__title_max_len == 0:
-            raise ValueError('title or given string have 0 length')
-
-        if not string.startswith('\n'):
-            string = '\n' + string
-
-        string_split = string.splitlines()
-        string_max = max(map(len, string_split))
-
-        filler = '\n' + ' ' * (abs(self.__title_max_len - string_max) // 2)
-        string = filler.join(string_split)
-        return string
+        return _align_art(string, self.__title_max_len)
 
     def __dealer_stats(self, dealer, hide=True):
-        string = "\n Dealer's Hand:"
+        hand = dealer.hand
+        key = hand.status, hide
+        if hand.view is not None and hand.view[0] == key:
+            return hand.view[1]
 
         if hide:
-            val_str = '1/11' if dealer.hand.cards[0].rank == 'A' \
-                else str(dealer.hand.cards[0].value)
+            val_str = '1/11' if hand.cards[0].value == 11 else str(hand.cards[0].value)
             sts_str = 'Stand'
+            cards = [str(hand.cards[0]), '<-Hidden Card->']
         else:
-            val_str = dealer.hand.approx_val()
-            sts_str = dealer.hand.status
-
-        # Getting maximum width
-        max_width = 7  # "Value: "
+            val_str = hand.approx_val()
+            sts_str = hand.status
+            cards = [str(card) for card in hand.cards]
 
-        # For value string
-        value = len(val_str) + 7  # "Value: "
-        if value > max_width:
-            max_width = value
-
-        # For status string
-        value = len(sts_str) + 8  # "Status: "
-        if value > max_width:
-            max_width = value
-
-        # For Card string length
-        if hide:
-            value = len(str(dealer.hand.cards[0]))
-            if value > max_width:
-                max_width = value
+        # Getting maximum width, "Value: ", "Status: " and card strings
+        max_width = max(7, len(val_str) + 7, len(sts_str) + 8, *map(len, cards))
 
-            value = len('<-Hidden Card->')  # For hiding card
-            if value > max_width:
-                max_width = value
-        else:
-            for card in dealer.hand.cards:
-                value = len(str(card))
-                if max_width < value:
-                    max_width = value
-
-        # Horizontal Bar
         h_bar = self.__wrap_hb(f" +-{'-' * max_width}-+")
-        string += f"\n{h_bar}"
-
-        # Value Line
-        val_line = f" {self.VB} {('Value: ' + val_str).center(max_width)} {self.VB}"
-        string += f"\n{val_line}"
-
-        # Status Line
         sts_line = f" {self.VB} {('Status: ' + sts_str).center(max_width)} {self.VB}"
-        string += f"\n{self.__wrap_word(sts_line, sts_str)}"
-
-        # Separator Line
-        string += f"\n{h_bar}"
-
-        # Cards Lines
-        if hide:
-            card1 = f"\n {self.VB} {str(dealer.hand.cards[0]).center(max_width)} {self.VB}"
-            card2 = f"\n {self.VB} {'<-Hidden Card->'.center(max_width)} {self.VB}"
-            string += card1 + card2
-        else:
-            string += ''.join(f"\n {self.VB} {str(card).center(max_width)} {self.VB}"
-                              for card in dealer.hand.cards)
-
-        # End Line
-        string += f"\n{h_bar}"
-
+        lines = ["\n Dealer's Hand:", h_bar,
+                 f" {self.VB} {('Value: ' + val_str).center(max_width)} {self.VB}",
+                 self.__wrap_word(sts_line, sts_str), h_bar]
+        lines += [f" {self.VB} {card.center(max_width)} {self.VB}" for card in cards]
+        lines.append(h_bar)
+
+        string = '\n'.join(lines)
+        hand.view = key, string
         return string
 
+    def __hand_cells(self, hand):
+        # Column of one hand, cached on the hand until a card, bet or status changes
+        key = hand.status, hand.bet
+        if hand.view is not None and hand.view[0] == key:
+            return hand.view[1]
+
+        val_str = hand.approx_val()
+        cards = [str(card) for card in hand.cards]
+        # "Hand n:", "Bet: ", "Value: ", "Status: " and card strings
+        width = max(7, len(str(hand.bet)) + 5, len(val_str) + 7, len(hand.status) + 8,
+                    *map(len, cards))
+
+        cells = [f"Hand: {hand.count}".center(width),
+                 f"Bet: {hand.bet}".center(width),
+                 f"Value: {val_str}".center(width),
+                 self.__wrap_word(f"Status: {hand.status}".center(width), hand.status)]
+        cells += [card.center(width) for card in cards]
+        hand.view = key, (width, cells)
+        return width, cells
+
     def __line_counter(self, string):
         length = len(string.splitlines())
         self.__lines += length if length else 1  # Handling empty string being printed
@@ -295,87 +1870,54 @@ class UserInterface:
             self.__lines += 1
 
     def __player_stats(self, player):
-        string = f'\n {player.name}: [ Balance: {player.balance} ]'
-
-        # Getting max height, width for align
-        max_width = []
-        max_cards = 0
-        for hand in player.hands:
-            width = 7  # "Hand n:"
-
-            # For Bet string length
-            value = len(str(hand.bet)) + 5  # "Bet: "
-            if width < value:
-                width = value
-
-            # For Value string length
-            value = len(hand.approx_val()) + 7  # "Value: "
-            if width < value:
-                width = value
-
-            # For Status string length
-            value = len(hand.status) + 8  # "Status: "
-            if width < value:
-                width = value
-
-            # For Card string length
-            for card in hand.cards:
-                value = len(str(card))
-                if width < value:
-                    width = value
-
-            # For no of cards (height)
-            value = len(hand.cards)
-            if max_cards < value:
-                max_cards = value
-
-            max_width.append(width)
-
-        # Horizontal Bar
-        h_bar = ' +'
-        for w in max_width:
-            h_bar += f"-{'-' * w}-+"
-        h_bar = self.__wrap_hb(h_bar)
-
-        # First Line
-        string += f"\n{h_bar}"
-
-        # Hand, Bet, Value, Status Lines
-        hand_line = bet_line = val_line = sts_line = f' {self.VB}'
-        for i in range(len(player.hands)):
-            hand_str = f"Hand: {player.hands[i].count}".center(max_width[i])
-            bet_str = f"Bet: {player.hands[i].bet}".center(max_width[i])
-            val_str = f"Value: {player.hands[i].approx_val()}".center(max_width[i])
-            sts_str = f"Status: {player.hands[i].status}".center(max_width[i])
-
-            hand_line += f" {hand_str} {self.VB}"
-            bet_line += f" {bet_str} {self.VB}"
-            val_line += f" {val_str} {self.VB}"
-            sts_line += f" {self.__wrap_word(sts_str, player.hands[i].status)} {self.VB}"
-
-        string += f"\n{hand_line}\n{bet_line}\n{val_line}\n{sts_line}\n{h_bar}"
-
-        # Cards List
-        for i in range(max_cards):
-            cards_line = f' {self.VB}'
-            for j in range(len(player.hands)):
-                if i < len(player.hands[j].cards):
-                    card_str = f"{player.hands[j].cards[i]}".center(max_width[j])
-                else:
-                    card_str = "".center(max_width[j])
-                cards_line += f" {card_str} {self.VB}"
-            string += f"\n{cards_line}"
-
-        # End Line
-        string += f"\n{h_bar}"
-
-        return string
-
-    def __print_error(self, msg):
-        self.input(f'{colorama.Fore.RED}{msg}'
-                   f', press [Enter] to try again... {colorama.Fore.RESET}')
+        columns = [self.__hand_cells(hand) for hand in player.hands]
+        h_bar = self.__wrap_hb(' +' + ''.join(f"-{'-' * width}-+" for width, _ in columns))
+        rows = max(len(cells) for _, cells in columns)
+
+        lines = [f'\n {player.name}: [ Balance: {player.balance} ]', h_bar]
+        for i in range(rows):
+            lines.append(f' {self.VB}' + ''.join(
+                f" {cells[i] if i < len(cells) else ' ' * width} {self.VB}"
+                for width, cells in columns))
+            if i == 3:  # Hand, Bet, Value, Status then the cards
+                lines.append(h_bar)
+        lines.append(h_bar)
+
+        return '\n'.join(lines)
+
+    async def __print_error(self, msg):
+        await self.input(f'{_Fore.RED}{msg}'
+                         f', press [Enter] to try again... {_Fore.RESET}')
         self.clear(2)
 
+    def __render(self, frame):
+        lines = frame.split('\n')
+        old = self.__frame
+        if old is None or self.__lines != self.__frame_end:  # Frame scrolled or overwritten
+            self.clear()
+            self.print(frame)
+            self.__frame = lines
+            self.__frame_end = self.__lines
+            return
+
+        # Jump to the first frame line and rewrite only the lines that changed
+        out = [f'\x1b[{len(old)}A']
+        for i, line in enumerate(lines):
+            if i >= len(old) or old[i] != line:
+                out.append(self.ERASE_LINE + self.CARRIAGE_RETURN + line)
+            out.append('\n')
+        extra = len(old) - len(lines)
+        if extra > 0:  # Erasing the leftover of a taller frame
+            out.append((self.ERASE_LINE + '\n') * extra + f'\x1b[{extra}A')
+        self.__write(''.join(out))
+        self.__lines += len(lines) - len(old)
+        self.__frame = lines
+        self.__frame_end = self.__lines
+
+    def __round_str(self, pcount):
+        return f"\n {_Fore.CYAN}Round {self.round_count}: " \
+               f"[ Decks: {self.deck_count} | Players: {pcount} ]{self.F_RESET}\n"
+
     def __wrap_handop(self, op_lst):
         string = f"[ {self.COLOR['H']}[H]{self.F_RESET}it," \
                  f" {self.COLOR['S']}[S]{self.F_RESET}tand"
@@ -400,6 +1942,10 @@ class UserInterface:
         w_word = f'{color}{word}{post}'
         return string.replace(word, w_word)
 
+    def __write(self, string):
+        self.bytes_out += len(string)
+        self.__out.append(string)
+
     def clear(self, lines=None):
         if lines is not None and not (-1 < lines < (self.__lines + 1)):
             raise ValueError('Invalid Lines ' + lines)
@@ -410,10 +1956,19 @@ class UserInterface:
             length = lines
 
         string = (self.CURSOR_UP + self.ERASE_LINE) * length
-        print(string + self.CARRIAGE_RETURN, end='')
+        self.__write(string + self.CARRIAGE_RETURN)
         self.__lines -= length
+        if self.__lines < self.__frame_end:  # Last frame partly erased
+            self.__frame = None
+
+    def flush(self):
+        """Hands every write since the last flush to writer as one string."""
+        if self.__out:
+            self.writer(''.join(self.__out))
+            self.__out.clear()
+            self.writes += 1
 
-    def get_bet(self, player):
+    async def get_bet(self, player):
         maximum = 1000
         if maximum > player.balance:
             maximum = player.balance
@@ -423,25 +1978,32 @@ class UserInterface:
         prompt_label = f' {player.name} -> Enter bet [Min: {minimum}, ' \
                        f'Max: {maximum}, x{multiples}]: '
         while True:
-            amount = self.get_int(prompt_label, minimum, maximum, multiples)
+            amount = await self.get_int(prompt_label, minimum, maximum, multiples)
             if player.have_bal(amount):
                 self.clear(1)
                 return amount
             else:
-                self.__print_error(' Balance not enough')
-
-    def get_decision(self, player, hand, op_lst):
-        self.print(f'\n {player.name}\'s Hand {hand.count} ->')
+                await self.__print_error(' Balance not enough')
+
+    async def get_decision(self, player, hand, op_lst, hint=None):
+        start = self.__lines
+        string = f'\n {player.name}\'s Hand {hand.count} ->'
+        if hint:  # Expected value of each option from option_ev
+            best = max(hint, key=hint.get)
+            string += '\n  Hint: ' + ', '.join(
+                f"{self.COLOR[op]}{'*' if op == best else ''}{op} {ev:+.3f}{self.F_RESET}"
+                for op, ev in hint.items())
+        self.print(string)
         label = f'  Choose a Option {self.__wrap_handop(op_lst)}: '
         while True:
-            selection = self.input(label).upper()
+            selection = (await self.input(label)).upper()
             if len(selection) and selection[0] in op_lst:
-                self.clear(2)
+                self.clear(self.__lines - start)
                 return selection[0]
             else:
-                self.__print_error(' Invalid input')
+                await self.__print_error(' Invalid input')
 
-    def get_int(self, label, low, high, multiples=0):
+    async def get_int(self, label, low, high, multiples=0):
         if multiples:
             label_str = label
         else:
@@ -449,48 +2011,52 @@ class UserInterface:
             multiples = 1
 
         while True:
-            num = self.input(label_str)
+            num = await self.input(label_str)
             if num.isdecimal() and (low <= int(num) <= high) and (int(num) % multiples) == 0:
                 self.clear(1)
                 return int(num)
             else:
-                self.__print_error(' Invalid input')
+                await self.__print_error(' Invalid input')
 
-    def get_name(self, count):
+    async def get_name(self, count):
         label = f' Enter Player {count} Name: '
         while True:
-            name = self.input(label)
+            name = await self.input(label)
             if 0 < len(name) < 9:
                 return name
             else:
-                self.__print_error(' Invalid name')
+                await self.__print_error(' Invalid name')
 
-    def input(self, label=''):
+    async def input(self, label=''):
         self.__line_counter(label)
-        print(label, end='', flush=True)
+        self.__write(label)
+        self.flush()  # Screen complete until the answer
         try:
-            data = input().strip()
+            data = (await self.reader()).strip()
+        except ConnectionError:  # Network seat left, ends its table
+            raise
         except Exception:  # Handling EOF and other Errors
             data = ''
         return data
 
     def print(self, string=''):
         self.__line_counter(string)
-        print(string, flush=True)
+        self.__write(string + '\n')
 
     def print_round(self, pcount):
-        self.print(f"\n {colorama.Fore.CYAN}Round {self.round_count}: "
-                   f"[ Decks: {self.deck_count} | Players: {pcount} ]{self.F_RESET}\n")
+        self.print(self.__round_str(pcount))
 
     def print_stats(self, dealer, players, hide=True):
+        # Redraws by diffing against the last frame when it is still on screen
+        parts = [self.__title_art, self.__round_str(len(players)), ' GAME TABLE: ',
+                 self.__dealer_stats(dealer, hide)]
+        parts += [self.__player_stats(player) for player in players]
+        self.__render('\n'.join(parts))
+
+    def open(self):
+        """Starts drawing, bright text on a cleared screen."""
+        self.print(_BRIGHT)
         self.clear()
-        self.print_title()
-        self.print_round(len(players))
-        self.print(f' GAME TABLE: ')
-        string = self.__dealer_stats(dealer, hide)
-        for player in players:
-            string += '\n' + self.__player_stats(player)
-        self.print(string)
 
     def print_title(self):
         self.print(self.__title_art)
@@ -499,7 +2065,13 @@ class UserInterface:
         self.print(f'\x1b]2;{string}\x07')
         self.clear(1)
 
-    def tell_info(self, label, time=5):
+    def skip(self):
+        """Ends the running tell_info countdown early."""
+        if self.__skip is not None:
+            self.__skip.set()
+
+    async def tell_info(self, label, time=5):
+        import asyncio
         if not isinstance(time, int) or time <= 0:
             raise ValueError('Invalid time argument ' + time)
 
@@ -507,28 +2079,158 @@ class UserInterface:
             self.print()
             label = label[1:]
 
-        while time:
-            print(f'{self.ERASE_LINE}{self.CARRIAGE_RETURN}{label}({time})', end='', flush=True)
+        # Made here, Python < 3.10 binds an Event to the loop current at creation
+        self.__skip = skip = asyncio.Event()
+        while time and self.pace > 0 and not skip.is_set():
+            self.__write(f'{self.ERASE_LINE}{self.CARRIAGE_RETURN}{label}({time})')
+            self.flush()
             time -= 1
-            _tm.sleep(1)
+            try:
+                await asyncio.wait_for(skip.wait(), self.pace)
+            except asyncio.TimeoutError:
+                pass
 
         # Manual handling because of __line_counter stripping the carriage return
-        print(self.ERASE_LINE + self.CARRIAGE_RETURN + label)
+        self.__write(self.ERASE_LINE + self.CARRIAGE_RETURN + label + '\n')
         self.__lines += 1
+        self.flush()
 
-    def welcome_greet(self):
+    async def welcome_greet(self):
         self.print_title()
         self.print(self.__rule_art)
-        self.input(self.__align_w_title('Press [Enter] to Start Game... '))
+        await self.input(self.__align_w_title('Press [Enter] to Start Game... '))
         self.clear()
 
 
+DEALER_CACHE_SIZE = 1 << 16
+DEALER_BUST, DEALER_BJ = 22, 23  # Outcome slots after the 0 - 21 totals
+
+
+@_lru_cache(maxsize=DEALER_CACHE_SIZE)
+def _dealer_dist(hard, aces, ncards, comp, player_max):
+    # Outcome probabilities indexed by final total, DEALER_BUST or DEALER_BJ.
+    # Callers clamp player_max to 18, higher ones draw the same way.
+    value = hard + 10 if aces and hard < 12 else hard
+    result = [0.0] * 24
+    if value > 21:
+        result[DEALER_BUST] = 1.0
+        return tuple(result)
+    if ncards == 2 and value == 21:
+        result[DEALER_BJ] = 1.0
+        return tuple(result)
+
+    total = sum(comp)
+    # Same drawing rule as Table.play_dealer, the hole card is always drawn
+    if total == 0 or (ncards > 1 and not (value < 18 and value < player_max)):
+        result[value] = 1.0
+        return tuple(result)
+
+    for index, count in enumerate(comp):
+        if count:
+            prob = count / total
+            sub = comp[:index] + (count - 1,) + comp[index + 1:]
+            dist = _dealer_dist(hard + index + 1, aces or index == 0, ncards + 1, sub, player_max)
+            for slot, value in enumerate(dist):
+                if value:
+                    result[slot] += prob * value
+    return tuple(result)
+
+
+def dealer_cache_info():
+    return _dealer_dist.cache_info()
+
+
+def dealer_probabilities(upcard, shoe, player_max=21):
+    """
+    Exact distribution of the dealer's final hand for an upcard (Card or
+    value) against the unseen cards, a 10 slot tuple as from Table.unseen,
+    or a Deck for Deck.unseen. player_max is the best live player
+    total the dealer draws against. Returns {total: p, 'bust': p,
+    'blackjack': p} without the zero entries.
+    """
+    value = getattr(upcard, 'value', upcard)
+    comp = tuple(shoe.unseen() if isinstance(shoe, Deck) else shoe)
+    dist = _dealer_dist(1 if value == 11 else value, value == 11, 1, comp, min(player_max, 18))
+
+    result = {total: prob for total, prob in enumerate(dist[:22]) if prob}
+    result['bust'] = dist[DEALER_BUST]
+    result['blackjack'] = dist[DEALER_BJ]
+    return result
+
+
+def _settle_rule(value, status, dealer_value, dealer_bj):
+    # Table.settle for one hand: new status and payout per bet
+    if value > 21 or status == 'Surrender':
+        return status, 1
+    if dealer_value > 21:  # Dealer Busts
+        return ('BlackJack', 2.5) if status == 'BlackJack' else ('Win', 2)
+    if value > dealer_value:
+        return ('BlackJack', 2.5) if status == 'BlackJack' else ('Win', 2)
+    if value == dealer_value:
+        if status == 'BlackJack' and not dealer_bj:
+            return 'BlackJack', 2.5
+        if status != 'BlackJack' and dealer_bj:
+            return 'Lost', 0
+        return 'Push', 1
+    return 'Lost', 0
+
+
+@_lru_cache(maxsize=None)
+def settle_outcomes():
+    """
+    (status code, payout per bet) by [dealer value (22 for bust) * 2 +
+    dealer blackjack][status code][hand value], 3:2 blackjack pays
+    round(bet * 2.5) as in Table.settle. Built on first use.
+    """
+    return tuple(
+        tuple(tuple((STATUS_CODE[outcome[0]], outcome[1]) for outcome in (
+            _settle_rule(value, status, dealer_value, dealer_bj) for value in range(32)))
+            for status in STATUSES)
+        for dealer_value in range(23) for dealer_bj in (False, True))
+
+
+_settle_arrays = None  # settle_outcomes as NumPy status and payout arrays
+
+
+def settle_batch(values, statuses, bets, stakes, dealer_values, dealer_blackjacks):
+    """
+    Table.settle for a batch of hands from any number of rounds in one pass,
+    each argument has an entry per hand, statuses as STATUS_CODE codes.
+    Returns the settled status codes, payouts and balance deltas (payout -
+    stake), as NumPy arrays when NumPy is installed, else as array.array.
+    """
+    try:
+        import numpy
+    except ImportError:
+        table = settle_outcomes()
+        outcomes = [table[min(dealer_value, 22) * 2 + bool(dealer_bj)][status][value]
+                    for value, status, dealer_value, dealer_bj
+                    in zip(values, statuses, dealer_values, dealer_blackjacks)]
+        payouts = _array('q', [round(bet * payout) for bet, (_, payout) in zip(bets, outcomes)])
+        return (_array('B', [status for status, _ in outcomes]), payouts,
+                _array('q', [payout - stake for payout, stake in zip(payouts, stakes)]))
+
+    global _settle_arrays
+    if _settle_arrays is None:
+        _settle_arrays = (numpy.array([[[code for code, _ in row] for row in table]
+                                       for table in settle_outcomes()], numpy.uint8),
+                          numpy.array([[[payout for _, payout in row] for row in table]
+                                       for table in settle_outcomes()]))
+    index = (numpy.minimum(dealer_values, 22) * 2 + numpy.asarray(dealer_blackjacks, bool),
+             numpy.asarray(statuses), numpy.asarray(values))
+    # rint rounds half to even, as round does for the 3:2 payouts
+    payouts = numpy.rint(numpy.asarray(bets) * _settle_arrays[1][index]).astype(numpy.int64)
+    return _settle_arrays[0][index], payouts, payouts - numpy.asarray(stakes)
+
+
 def double_down(player, hand, card):
     if hand in player.hands and len(player.hands) == 1 and len(hand.cards) == 2 \
             and player.have_bal(hand.bet):
         player.balance -= hand.bet
         hand.bet += hand.bet
+        hand.stake = hand.bet
         hand.status = 'Double'
+        hand.doubled = True
         hand.add_card(card)
     else:  # Debug purpose
         raise Exception("Double can't be performed.")
@@ -544,8 +2246,7 @@ def hand_options(player, hand):
     if initial and len(player.hands) == 1 and player.have_bal(hand.bet):
         def_options.append('D')
 
-    if initial and hand.cards[0].value == hand.cards[1].value \
-            and len(player.hands) < 4 and player.have_bal(hand.bet):
+    if hand.pair and len(player.hands) < 4 and player.have_bal(hand.bet):
         def_options.append('L')
 
     if initial and len(player.hands) == 1:
@@ -554,6 +2255,273 @@ def hand_options(player, hand):
     return def_options
 
 
+def mimic_policy(player, hand, op_lst, upcard):
+    # Plays like the dealer, hit below 17 otherwise stand
+    return 'H' if hand.value < 17 else 'S'
+
+
+def _read_stdin():
+    # input() blocks, so it runs on a daemon thread that never holds up exit
+    import asyncio
+    import threading
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(method, value):
+        if not future.done():  # Awaiting task may be cancelled meanwhile
+            method(value)
+
+    def reader():
+        try:
+            data = input()
+        except Exception as error:  # EOF and others are raised in the awaiting task
+            loop.call_soon_threadsafe(resolve, future.set_exception, error)
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, data)
+
+    threading.Thread(target=reader, daemon=True).start()
+    return future
+
+
+def _write_stdout(string):
+    _sys.stdout.write(string)
+    _sys.stdout.flush()
+
+
+SHARD_ROUNDS = 10000  # Fixed shard size keeps results independent of worker count
+SIM_STATUSES = ('BlackJack', 'Win', 'Push', 'Lost', 'Bust', 'Surrender')
+
+
+def _simulate_shard(task):
+    (seed, shard, rounds, players, decks, shuffle, penetration, rng, policy, bet, profile,
+     history, checkpoint, every) = task
+    kind, rng = rng, make_rng(seed, rng, shard)  # Own stream per shard
+    if policy is strategy_policy:  # The table of the shard's shoe
+        policy = StrategyPolicy(decks)
+    balance = bet * 4 * (rounds + 1)  # Never runs out within the shard
+    table = Table([Player(f'Bot {i + 1}', balance) for i in range(players)],
+                  deck=Deck(decks, rng, shuffle, penetration))
+    table.rounds = shard * SHARD_ROUNDS  # Round numbers run on across shards
+    if profile:
+        table.profiler = Profiler()
+    if history:
+        table.history = HandHistory(f'{history}.{shard}', seed, table.deck, SHARD_ROUNDS, kind)
+    table.stats = RunStats(bet)
+    played = 0
+    if checkpoint:
+        saver = Checkpoint(f'{checkpoint}.{shard}', (seed, shard, rounds, players, decks, shuffle,
+                                                     penetration, kind, bet, bool(history)))
+        if saver.load(table):
+            played = table.rounds - shard * SHARD_ROUNDS
+    if history and not played:  # Records of a run that failed before any checkpoint
+        table.history.truncate(HandHistory.HEADER.size)
+
+    def bet_policy(player):
+        return bet
+
+    while played < rounds:
+        table.play_round(bet_policy, policy)
+        played += 1
+        if checkpoint and (played % every == 0 or played == rounds):
+            saver.save(table)
+    if checkpoint:
+        saver.close()
+    if history:
+        table.history.close()
+    result = {'stats': table.stats}
+    if profile:
+        result['profile'] = table.profiler.phases
+    return result
+
+
+def simulate(rounds, players=1, decks=6, policy=mimic_policy, workers=1, seed=0, bet=10,
+             profile=False, history=None, shuffle='empty', penetration=0.75, rng='random',
+             checkpoint=None, every=1000):
+    """
+    Plays rounds headlessly and returns the merged totals as a dict, the
+    merged RunStats of all shards as 'stats'. Rounds are cut into
+    SHARD_ROUNDS sized shards, each with its own shoe and random stream
+    derived from seed, so the result for a seed is the same for any
+    workers count. policy must be picklable for workers > 1,
+    strategy_policy plays the Strategy table of decks decks.
+    The 'stats' bankroll quantiles are of the running net within each
+    SHARD_ROUNDS round shard, every shard starts its players at 0.
+    profile=True adds the merged Profiler of all shards as 'profile'.
+    history appends every round to that HandHistory file, shards write
+    their own files which are merged in shard order, seed must be an int.
+    shuffle and penetration pick the Deck shuffle mode of every shard, rng
+    the RNG_KINDS kind of their streams.
+    checkpoint saves a Checkpoint of each shard after every `every`
+    rounds, to that path plus the shard index. Calling again with the same
+    arguments resumes from them with the same result, they are deleted
+    once the run ends. Profile timings from before resuming are lost.
+    """
+    if history:  # Refused before any shard runs
+        if players > HandHistory.SEATS:
+            raise ValueError(f'A hand history holds upto {HandHistory.SEATS} seats')
+        with HandHistory(history, seed, Deck(decks, None, shuffle, penetration),
+                         SHARD_ROUNDS, rng) as log:
+            if log.rounds is not None:
+                raise ValueError('Hand history file already holds rounds')
+    tasks = [(seed, shard, min(SHARD_ROUNDS, rounds - start), players, decks, shuffle,
+              penetration, rng, policy, bet, profile, history, checkpoint, every)
+             for shard, start in enumerate(range(0, rounds, SHARD_ROUNDS))]
+
+    try:
+        if workers > 1 and len(tasks) > 1:
+            import multiprocessing
+            with multiprocessing.Pool(workers) as pool:
+                results = pool.map(_simulate_shard, tasks, chunksize=1)
+        else:
+            results = list(map(_simulate_shard, tasks))
+    except BaseException:
+        if history and not checkpoint:  # Checkpointed shards resume with their files
+            for task in tasks:
+                if _os.path.exists(f'{history}.{task[1]}'):
+                    _os.remove(f'{history}.{task[1]}')
+        raise
+
+    stats = RunStats(bet)
+    profiler = Profiler() if profile else None
+    for result in results:  # Merged in shard order
+        if profile:
+            profiler.merge(result['profile'])
+        stats.merge(result['stats'])
+    hands, net, _, wagered = stats.groups['hand']
+    total = {'rounds': stats.rounds, 'hands': hands, 'wagered': wagered, 'net': net}
+    total.update((status, stats.statuses[status]) for status in SIM_STATUSES)
+    total['stats'] = stats
+    if profile:
+        total['profile'] = profiler
+    if history:
+        with HandHistory(history, seed, Deck(decks, None, shuffle, penetration),
+                         SHARD_ROUNDS, rng) as log:
+            for task in tasks:
+                log.merge(f'{history}.{task[1]}')
+    if checkpoint:
+        for task in tasks:
+            Checkpoint(f'{checkpoint}.{task[1]}').remove()
+    return total
+
+
+def _stand_ev(value, blackjack, up, comp):
+    # Per unit bet, settled like Table.settle with the dealer drawing against value
+    dist = _dealer_dist(1 if up == 11 else up, up == 11, 1, comp, min(value, 18))
+    win = 1.5 if blackjack else 1.0
+    ev = dist[DEALER_BUST] * win - dist[DEALER_BJ] * (not blackjack)
+    for total in range(22):
+        prob = dist[total]
+        if prob:
+            if value > total:
+                ev += prob * win
+            elif value < total:
+                ev -= prob
+            elif blackjack:  # Tie on 21 against a non blackjack dealer
+                ev += prob * win
+    return ev
+
+
+def _option_evs(up, comp):
+    # Per unit bet EVs of a hand state against upcard value up and a shoe
+    # composition, the caches are shared by every state asked for
+    total = sum(comp)
+    probs = [(index + 1, count / total) for index, count in enumerate(comp) if count]
+    stand_cache = {}
+    play_cache = {}
+    split_cache = {}
+
+    def stand(value, blackjack=False):
+        key = value, blackjack
+        if key not in stand_cache:
+            stand_cache[key] = _stand_ev(value, blackjack, up, comp)
+        return stand_cache[key]
+
+    def hit(hard, aces):
+        ev = 0.0
+        for card, prob in probs:
+            ev += prob * play(hard + card, aces or card == 1)
+        return ev
+
+    def play(hard, aces, ncards=3):
+        # Best of hit or stand, keyed by hand state so sibling hands share it
+        value = hard + 10 if aces and hard < 12 else hard
+        if value > 21:
+            return -1.0
+        key = value, aces and hard < 12, ncards == 2 and value == 21
+        if key not in play_cache:
+            if key[2]:  # Two card 21 is paid as BlackJack, even after a split
+                play_cache[key] = stand(21, True)
+            else:
+                play_cache[key] = max(stand(value), hit(hard, aces))
+        return play_cache[key]
+
+    def split_hand(pair, hands):
+        # EV of one split hand holding a pair card, with hands already on table
+        if (pair, hands) not in split_cache:
+            ev = 0.0
+            first = 1 if pair == 11 else pair
+            for card, prob in probs:
+                value = play(first + card, pair == 11 or card == 1, 2)
+                if (11 if card == 1 else card) == pair and hands < 4:
+                    value = max(value, 2 * split_hand(pair, hands + 1))
+                ev += prob * value
+            split_cache[pair, hands] = ev
+        return split_cache[pair, hands]
+
+    def evs(hard, soft, pair, blackjack, hands, options):
+        # {option: ev} for options, hands is the count before a split
+        value = hard + 10 if soft else hard
+        result = {}
+        for option in options:
+            if option == 'H':
+                result['H'] = hit(hard, soft)
+            elif option == 'S':
+                result['S'] = stand(value, blackjack)
+            elif option == 'D':
+                ev = 0.0
+                for card, prob in probs:
+                    new = hard + card
+                    new = new + 10 if (soft or card == 1) and new < 12 else new
+                    ev += prob * (-1.0 if new > 21 else stand(new))
+                result['D'] = 2 * ev
+            elif option == 'L':
+                result['L'] = 2 * split_hand(pair, hands + 1)
+            elif option == 'R':
+                result['R'] = -0.5
+        return result
+
+    return evs
+
+
+def option_ev(player, hand, dealer_upcard, shoe):
+    """
+    Expected value per unit bet of each legal option of hand_options,
+    returned as {option: ev}. Card odds come from the unseen cards (a
+    10 slot tuple as from Table.unseen, or a Deck for Deck.unseen) held
+    fixed while the player draws, the dealer side is exact via
+    _dealer_dist. Split hands follow the Split
+    rules, only hit or stand with re-split up to 4 hands.
+    """
+    up = getattr(dealer_upcard, 'value', dealer_upcard)
+    comp = tuple(shoe.unseen() if isinstance(shoe, Deck) else shoe)
+    soft = hand.soft
+    return _option_evs(up, comp)(hand.value - 10 * soft, soft, hand.pair,
+                                 hand.status == 'BlackJack', len(player.hands),
+                                 hand_options(player, hand))
+
+
+class OptimalPolicy:
+    """Bot policy picking the option of best option_ev against its table's unseen cards."""
+    __slots__ = 'table'
+
+    def __init__(self, table):
+        self.table = table
+
+    def __call__(self, player, hand, op_lst, upcard):
+        evs = option_ev(player, hand, upcard, self.table.unseen())
+        return max(evs, key=evs.get)
+
+
 def split(player, hand, h_card1, h_card2):
     if hand in player.hands and len(hand.cards) == 2 and len(player.hands) < 4:
         card = hand.pop_card()
@@ -567,6 +2535,24 @@ def split(player, hand, h_card1, h_card2):
         raise Exception("Split can't be performed.")
 
 
+def strategy_policy(player, hand, op_lst, upcard):
+    # Table of the default shoe, StrategyPolicy plays other shoes
+    strategy = _strategies.get(STRATEGY_DECKS) or load_strategy()
+    return strategy.decide(hand, upcard, op_lst)
+
+
+class StrategyPolicy:
+    """Bot policy playing the Strategy table of a rules deck shoe, picklable for simulate."""
+    __slots__ = 'rules'
+
+    def __init__(self, rules=STRATEGY_DECKS):
+        self.rules = rules
+
+    def __call__(self, player, hand, op_lst, upcard):
+        strategy = _strategies.get(self.rules) or load_strategy(rules=self.rules)
+        return strategy.decide(hand, upcard, op_lst)
+
+
 def surrender(player, hand):
     if hand in player.hands and len(player.hands) == 1:
         hand.bet //= 2
@@ -575,22 +2561,7 @@ def surrender(player, hand):
         raise Exception("Surrender can't be performed.")
 
 
-def exit_handl(signal, frame):
-    print(f'\n\n{colorama.Fore.RED} Ctrl + C triggered, Exiting Game...\n')
-    _sys.exit()
-
-
-def game():
-    _sig.signal(_sig.SIGINT, exit_handl)
-    __title__ = 'BlackJack'
-    __version__ = '1.1'
-    __author__ = 'nknantha'
-
-    if 'idlelib' in _sys.modules:  # To detect IDLE environment
-        print("IDLE environment detected. This script can't work on IDLE.")
-        _sys.exit()
-
-    g_title = f'''{colorama.Fore.GREEN}
+TITLE_ART = f'''{_Fore.GREEN}
  2121212b.   212                   212   212121                   212
  212   "21b  212                   212     "212                   212
  212   .21P  212                   212      212                   212
@@ -602,159 +2573,376 @@ def game():
                                          .d21P
  .d212b    .d2b.  .d2   2b. .d212.    .d21P"
  21   db. 2b._.d2 21 "2" 21 212      212P"
- "Y212P"  28   82 21     21 "Y212"  {colorama.Fore.BLUE}https://github.com/nknantha/BlackJack
-{colorama.Fore.RESET}'''
+ "Y212P"  28   82 21     21 "Y212"  {_Fore.BLUE}https://github.com/nknantha/BlackJack
+{_Fore.RESET}'''
 
-    g_rules = f'''{colorama.Fore.CYAN}Rules:
+RULE_ART = f'''{_Fore.CYAN}Rules:
  - BlackJack pays 3:2
  - Split allowed, Re-split upto 3 hands
  - Splitted hands only allowed hit or stand
  - Dealer must stand on all 17\'s
  - Players name limit 8 characters
  - Bet minimum=10, maximum=1000 and multiples of 2
-{colorama.Fore.YELLOW} 
+{_Fore.YELLOW} 
 Tips:
  - Maximize console for better experience
  - Use CTRL + C to exit game during gameplay
-{colorama.Fore.WHITE}'''
+{_Fore.WHITE}'''
 
-    ui = UserInterface(g_title, g_rules)
-    ui.set_con_title(f'{__title__} v{__version__}')
 
-    # Welcome Screen
-    ui.welcome_greet()
+def _init_console():
+    # colorama wraps stdout to translate the ANSI codes on old Windows consoles,
+    # only a game drawing to this terminal needs it
+    import colorama
+    colorama.init()
 
-    ui.print_title()
-    ui.deck_count = ui.get_int('Deck Count', 1, 8)
-    deck = Deck(ui.deck_count)
 
-    players = [Player(ui.get_name(i + 1)) for i in range(ui.get_int('Player Count', 1, 7))]
-    dealer = Dealer()
+def exit_handl(signal, frame):
+    print(f'\n\n{_Fore.RED} Ctrl + C triggered, Exiting Game...\n')
+    _sys.exit()
+
+
+def game(hints=False, pace=1.0, profile=None, history=None, seed=None, shuffle='empty',
+         penetration=0.75, rng='random', checkpoint=None):
+    import asyncio
+    import signal
+    _init_console()
+    signal.signal(signal.SIGINT, exit_handl)
+
+    if 'idlelib' in _sys.modules:  # To detect IDLE environment
+        print("IDLE environment detected. This script can't work on IDLE.")
+        _sys.exit()
+
+    asyncio.run(_game(UserInterface(TITLE_ART, RULE_ART, pace), hints, profile, history,
+                      seed, shuffle, penetration, rng, checkpoint))
+
+
+async def _game(ui, hints, profile=None, history=None, seed=None, shuffle='empty',
+                penetration=0.75, rng='random', checkpoint=None):
+    __title__ = 'BlackJack'
+    __version__ = '1.1'
+    __author__ = 'nknantha'
+
+    ui.open()
+    ui.set_con_title(f'{__title__} v{__version__}')
+
+    # Welcome Screen
+    await ui.welcome_greet()
+
+    seed_given = seed
+    if seed is None:  # Own seed per game, so the history can be replayed
+        seed = _random.getrandbits(63)
+    saver = Checkpoint(checkpoint, rng) if checkpoint else None
+    table = Table([], deck=Deck(1, make_rng(seed, rng), shuffle, penetration))
+    resumed = saver is not None and saver.load(table, ui)
+    if not resumed:
+        ui.print_title()
+        ui.deck_count = await ui.get_int('Deck Count', 1, 8)
+        table.deck = Deck(ui.deck_count, table.deck.rng, shuffle, penetration)
+        table.players = [Player(await ui.get_name(i + 1))
+                         for i in range(await ui.get_int('Player Count', 1, 7))]
+    if history:
+        if resumed and seed_given is None and _os.path.exists(history):
+            with HistoryReader(history) as reader:  # Same header as the saved game
+                seed = reader.seed
+        table.history = HandHistory(history, seed, table.deck, rng=rng)
+        if resumed:  # Again with the history open, its records after the snapshot are dropped
+            saver.load(table, ui)
+        if table.history.rounds not in (None, table.rounds):
+            table.history.close()
+            raise ValueError('Hand history file already holds rounds of another game')
+    if profile:  # JSON or CSV file for the per phase timings
+        table.profiler = Profiler()
+    try:
+        await play_table(ui, table, hints, saver)
+        if saver:  # Game over, nothing to resume
+            saver.remove()
+    finally:
+        if saver:
+            saver.close()
+        if profile:
+            table.profiler.write(profile)
+        if history:
+            table.history.close()
+
+
+async def play_table(ui, table, hints=False, checkpoint=None):
+    """
+    Gameplay loop of one table, several can run on one event loop.
+    checkpoint is a Checkpoint saved before every round.
+    """
+    prof = table.profiler
+
+    def render(hide=True):
+        if prof:
+            prof.start('render')
+        ui.print_stats(table.dealer, table.players, hide)
+        if prof:
+            prof.stop()
+
+    async def decision(player, hand, op_lst, upcard):
+        render()
+        hint = option_ev(player, hand, upcard, table.unseen()) if hints else None
+        return await ui.get_decision(player, hand, op_lst, hint)
 
     while True:  # Gameplay Loop
 
+        if checkpoint:
+            checkpoint.save(table, ui)
         ui.round_count += 1
         ui.clear()
         ui.print_title()
-        ui.print_round(len(players))
+        ui.print_round(len(table.players))
 
         # Getting Bets and Creating Hands
-        dealer.add_hand()
-        for player in players:
-            player.add_hand(ui.get_bet(player))
+        if prof:
+            prof.start('betting')
+        table.start_round([await ui.get_bet(player) for player in table.players])
 
         # Initial Gameplay
-        for _ in range(2):
-            dealer.hand.add_card(deck.get_card())
-            for person in players:
-                person.hands[0].add_card(deck.get_card())
+        if prof:
+            prof.swap('deal')
+        table.deal()
 
         # Player decision & gameplay
-        for player in players:
-            for hand in player.hands:
-
-                while hand.status[:2] == 'Li':  # For multiple hits
-                    ui.print_stats(dealer, players)
-                    op_lst = hand_options(player, hand)
-                    selection = ui.get_decision(player, hand, op_lst)
-
-                    if selection == 'H':
-                        hand.add_card(deck.get_card())
-                    elif selection == 'S':
-                        hand.status = 'Stand'
-                    elif selection == 'D':
-                        double_down(player, hand, deck.get_card())
-                    elif selection == 'L':
-                        split(player, hand, deck.get_card(), deck.get_card())
-                    elif selection == 'R':
-                        surrender(player, hand)
-                    else:  # For debug purpose
-                        raise Exception(f'Problem on Looping Gameplay\nPlayer={player.name} '
-                                        f'Hand={hand.name} Selection={selection}')
+        if prof:
+            prof.swap('decisions')
+        await table.aplay_players(decision)
+        if prof:
+            prof.stop()
 
         # Before Dealers Gameplay
-        ui.print_stats(dealer, players)
-        ui.tell_info(f"\n {colorama.Fore.GREEN}Dealer's Gameplay...{ui.F_RESET}")
+        render()
+        await ui.tell_info(f"\n {_Fore.GREEN}Dealer's Gameplay...{ui.F_RESET}")
 
         # Dealer Gameplay
-        hand_values = [hand.value for player in players for hand in player.hands
-                       if hand.value < 22]
-        if hand_values:  # Checking if dealer needs to play
-            player_max = max(hand_values)
-            while dealer.hand.value < 18 and dealer.hand.value < player_max:
-                dealer.hand.add_card(deck.get_card())
-            if dealer.hand.status[:2] == 'Li':
-                dealer.hand.status = 'Stand'
-        else:
-            dealer.hand.status = 'Win'
+        if prof:
+            prof.start('dealer')
+        table.play_dealer()
 
         # Winning & Bonus Distribution
-        if dealer.hand.value > 21:  # Dealer Busts
-            for player in players:
-                for hand in player.hands:
-                    if hand.value < 22:  # Filtering Non-Bust
-                        if hand.status[:2] == 'Bl':
-                            hand.bet = round(hand.bet * 2.5)
-                        elif hand.status[:2] != 'Su':
-                            hand.status = 'Win'
-                            hand.bet *= 2
-        else:  # Dealer not Busts
-            for player in players:
-                for hand in player.hands:
-                    if hand.value < 22 and hand.status[:2] != 'Su':  # Filtering Non-Bust and Non-Surrender
-                        if hand.value > dealer.hand.value:
-                            if hand.status[:2] == 'Bl':
-                                hand.bet = round(hand.bet * 2.5)
-                            else:
-                                hand.status = 'Win'
-                                hand.bet *= 2
-                            dealer.hand.status = '-'
-                        elif hand.value == dealer.hand.value:
-                            if hand.status[:2] == 'Bl' and dealer.hand.status[:2] != 'Bl':
-                                hand.bet = round(hand.bet * 2.5)
-                                dealer.hand.status = '-'
-                            elif hand.status[:2] != 'Bl' and dealer.hand.status[:2] == 'Bl':
-                                hand.status = 'Lost'
-                                hand.bet = 0
-                            else:
-                                hand.status = 'Push'
-                                dealer.hand.status = '-'
-                        else:
-                            hand.status = 'Lost'
-                            hand.bet = 0
-
-            if dealer.hand.status != '-':
-                dealer.hand.status = 'Win'
+        if prof:
+            prof.swap('settle')
+        table.settle()
+        table.settled()
+        if prof:
+            prof.stop()
 
         # Final Stats
-        ui.print_stats(dealer, players, False)
-        ui.input('\n Press [Enter] to next round... ')
+        render(False)
+        await ui.input('\n Press [Enter] to next round... ')
 
         # Clearing Hands and Pushing Bets to Player
-        deck.return_cards(*dealer.hand.cards)
-        for player in players:
-            for hand in player.hands[:]:
-                player.balance += hand.bet
-                deck.return_cards(*hand.cards)
-                player.hands.remove(hand)
+        if prof:
+            prof.start('collect')
+        table.collect()
+        if prof:
+            prof.stop()
 
         # Checking for betting capacity
         ui.print()
-        for player in players[:]:
-            if not player.have_bal(10):  # Checking minimum balance
-                ui.print(f' {colorama.Fore.RED}Player {player.name} '
-                         f'kicked, having below minimum balance.{ui.F_RESET}')
-                players.remove(player)
+        if prof:
+            ui.print(f' {_Fore.CYAN}{prof.summary()}{ui.F_RESET}')
+        for player in table.remove_broke():  # Checking minimum balance
+            ui.print(f' {_Fore.RED}Player {player.name} '
+                     f'kicked, having below minimum balance.{ui.F_RESET}')
 
         # Changing players order and Gameplay exit
-        if players:
-            if len(players) > 1:
-                players = players[1:] + players[:1]
-            ui.tell_info('\n Going to next round...')
+        if table.players:
+            table.rotate()
+            await ui.tell_info('\n Going to next round...')
         else:
-            ui.tell_info(f'\n {colorama.Fore.RED}All players left, Exiting game...')
+            await ui.tell_info(f'\n {_Fore.RED}All players left, Exiting game...')
             break
 
 
+INPUT_MARK = '\x05'  # Ends every prompt sent to network clients, answered by one line
+
+
+def _stream_io(reader, writer):
+    # UserInterface reader and writer for one client connection
+
+    async def read_line():
+        writer.write(INPUT_MARK.encode())
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError('Client left')
+        return line.decode(errors='replace')
+
+    def write(string):
+        if not writer.is_closing():
+            writer.write(string.encode())
+
+    return read_line, write
+
+
+async def _serve_client(reader, writer, pace, hints):
+    ui = UserInterface(TITLE_ART, RULE_ART, pace, *_stream_io(reader, writer))
+    try:
+        await _game(ui, hints)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=2121, pace=1.0, hints=False):
+    """
+    Hosts a table per connection, every table runs play_table on this
+    event loop and renders only to its own client. All seats of a table
+    are played from that one connection, clients can't share a table, so
+    each frame has a single receiver.
+    """
+    import asyncio
+    server = await asyncio.start_server(
+        lambda reader, writer: _serve_client(reader, writer, pace, hints), host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def _bot_answer(prompt):
+    # Answer for a server prompt, used by the load generator
+    if 'Deck Count' in prompt:
+        return '6'
+    if 'Player Count' in prompt:
+        return '1'
+    if 'Name' in prompt:
+        return 'Bot'
+    if 'Enter bet' in prompt:
+        return '10'
+    if 'Choose a Option' in prompt:
+        return 'S'
+    return ''
+
+
+async def _client(host, port, answer, rounds=None, latencies=None):
+    import asyncio
+    import codecs
+    reader, writer = await asyncio.open_connection(host, port)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    sent = None
+    try:
+        while rounds is None or rounds > 0:
+            data = await reader.read(1 << 16)
+            if not data:
+                break
+            received = _tm.perf_counter()
+            text = pending + decoder.decode(data)
+            *done, pending = text.split(INPUT_MARK)
+            if answer is None:  # Interactive client
+                _write_stdout(''.join(done) + pending)
+            for part in done:
+                prompt = part.rsplit('\n', 1)[-1]
+                if sent is not None and latencies is not None:
+                    latencies.append(received - sent)
+                if answer is None:
+                    try:
+                        line = await _read_stdin()
+                    except EOFError:  # Input closed, leaving the table
+                        return
+                    pending = ''
+                else:
+                    line = answer(prompt)
+                    if 'next round' in prompt and rounds is not None:
+                        rounds -= 1
+                writer.write(f'{line}\n'.encode())
+                sent = _tm.perf_counter()
+            if answer is None:
+                pending = ''
+            else:
+                pending = pending[-256:]  # Only the prompt line is needed
+    finally:
+        writer.close()
+
+
+def connect(host='127.0.0.1', port=2121):
+    """Plays on a serve() table from this terminal."""
+    import asyncio
+    import signal
+    _init_console()
+    signal.signal(signal.SIGINT, exit_handl)
+    asyncio.run(_client(host, port, None))
+
+
+async def load_test(host='127.0.0.1', port=2121, clients=100, rounds=10):
+    """
+    Runs clients bot connections for rounds rounds each against a server
+    and reports the latency of every action in milliseconds.
+    """
+    import asyncio
+    latencies = []
+    start = _tm.perf_counter()
+    await asyncio.gather(*(_client(host, port, _bot_answer, rounds, latencies)
+                           for _ in range(clients)))
+    seconds = _tm.perf_counter() - start
+
+    latencies.sort()
+    count = len(latencies)
+    return {
+        'clients': clients,
+        'actions': count,
+        'seconds': seconds,
+        'actions_per_sec': count / seconds if seconds else 0.0,
+        'mean_ms': sum(latencies) / count * 1000 if count else 0.0,
+        'p99_ms': latencies[int(count * 0.99)] * 1000 if count else 0.0,
+    }
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='A python implementation of BlackJack.')
+    parser.add_argument('--hints', action='store_true', help='show option EV hints')
+    parser.add_argument('--pace', type=float, default=1.0, help='seconds per countdown tick')
+    parser.add_argument('--profile', metavar='FILE', help='write round phase timings, .json/.csv')
+    parser.add_argument('--history', metavar='FILE', help='append every round to a hand history')
+    parser.add_argument('--seed', type=int, help='shoe seed, for reproducible games')
+    parser.add_argument('--shuffle', choices=Deck.MODES, default='empty',
+                        help='when dealt cards are shuffled back in')
+    parser.add_argument('--penetration', type=float, default=0.75,
+                        help="share of the shoe dealt before a 'cut' reshuffle")
+    parser.add_argument('--rng', choices=RNG_KINDS, default='random',
+                        help='shoe random generator, pcg64 and philox need NumPy')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='save the game every round, resume it from there when it exists')
+    parser.add_argument('--replay', metavar='FILE', help='replay a hand history, check its cards')
+    parser.add_argument('--round', type=int, help='with --replay, fast-forward to this round')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2121)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--serve', action='store_true', help='host tables for network clients')
+    mode.add_argument('--connect', action='store_true', help='play on a hosted table')
+    mode.add_argument('--load-test', type=int, metavar='CLIENTS',
+                      help='run bot clients against a hosted table server')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        import asyncio
+        import signal
+        signal.signal(signal.SIGINT, exit_handl)
+        asyncio.run(serve(args.host, args.port, args.pace, args.hints))
+    elif args.connect:
+        connect(args.host, args.port)
+    elif args.load_test:
+        import asyncio
+        print(asyncio.run(load_test(args.host, args.port, args.load_test)))
+    elif args.replay:
+        def show(table):
+            dealer = table.dealer.hand
+            print(f'Round {table.rounds} Dealer: {" ".join(map(str, dealer.cards))} '
+                  f'{dealer.status}')
+            for player in table.players:
+                for hand in player.hands:
+                    print(f'  Seat {player.name + 1} Hand {hand.count}: '
+                          f'{" ".join(map(str, hand.cards))} {hand.status} '
+                          f'{hand.stake} -> {hand.bet}')
+
+        with HistoryReader(args.replay) as reader:
+            reader.replay(args.round or 1, args.round, show)
+    else:
+        game(args.hints, args.pace, args.profile, args.history, args.seed, args.shuffle,
+             args.penetration, args.rng, args.checkpoint)
+
+
 if __name__ == '__main__':
-    game()
+    main()
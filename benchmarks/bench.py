@@ -0,0 +1,241 @@
+"""
+BlackJack Benchmarks
+Times the deck, hand, settlement and rendering hot paths and reports
+nanoseconds per operation as JSON, optionally checked against a baseline.
+Usage: python benchmarks/bench.py [--quick] [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import BlackJack as bj  # noqa: E402
+
+SEED = 2121
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def _time(func, number, repeat):
+    # Best of repeat runs, in nanoseconds per call of func
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        func(number)
+        elapsed = (time.perf_counter_ns() - start) / number
+        best = elapsed if best is None or elapsed < best else best
+    return best
+
+
+def _seat(players, decks=6, balance=10 ** 9):
+    random.seed(SEED)
+    table = bj.Table([bj.Player(f'P{i + 1}', balance) for i in range(players)],
+                     deck=bj.Deck(decks, random.Random(SEED)))
+    return table
+
+
+def bench_get_card(number):
+    deck = bj.Deck(1, random.Random(SEED))
+    get_card, return_cards = deck.get_card, deck.return_cards
+    for _ in range(number):
+        return_cards(get_card())  # Every 52nd call goes through the reshuffle
+
+
+def bench_return_cards(number):
+    deck = bj.Deck(8, random.Random(SEED))
+    cards = [deck.get_card() for _ in range(4)]
+    for _ in range(number):
+        deck.return_cards(*cards)
+
+
+def bench_composition(number):
+    deck = bj.Deck(6, random.Random(SEED))
+    get_card, return_cards, composition = deck.get_card, deck.return_cards, deck.composition
+    for _ in range(number):
+        return_cards(get_card())
+        composition()  # Catches up one card, plus the recount of each new shoe
+
+
+def bench_add_card(number):
+    cards = bj.CARDS[:13]
+    hand = bj.Hand(10)
+    for i in range(number):
+        if len(hand.cards) == 4:
+            hand = bj.Hand(10)
+        hand.add_card(cards[i % 13])
+
+
+def bench_hand_options(number):
+    player = bj.Player('P1', 1000)
+    player.add_hand(10)
+    hand = player.hands[0]
+    hand.add_card(bj.CARDS[7])
+    hand.add_card(bj.CARDS[20])
+    for _ in range(number):
+        bj.hand_options(player, hand)
+
+
+def bench_split(number):
+    eight, nine, ten = bj.CARDS[7], bj.CARDS[8], bj.CARDS[9]
+    for _ in range(number):
+        player = bj.Player('P1', 1000)
+        player.add_hand(10)
+        hand = player.hands[0]
+        hand.add_card(eight)
+        hand.add_card(eight)
+        bj.split(player, hand, nine, ten)
+
+
+def bench_settle(number):
+    table = _seat(7)
+    table.start_round([10] * 7)
+    table.deal()
+    table.play_players(bj.mimic_policy)
+    table.play_dealer()
+    hands = [hand for player in table.players for hand in player.hands]
+    state = [(hand, hand.bet, hand.status) for hand in hands]
+    dealer_status = table.dealer.hand.status
+    for _ in range(number):
+        for hand, bet, status in state:
+            hand.bet, hand.status = bet, status
+        table.dealer.hand.status = dealer_status
+        table.settle()
+
+
+def bench_settle_batch(number):
+    rng = random.Random(SEED)
+    size = 1000  # Hands per batch
+    columns = ([rng.randrange(4, 31) for _ in range(size)],
+               [rng.choice((1, 2, 3, 4, 5)) for _ in range(size)], [10] * size, [10] * size,
+               [rng.randrange(17, 27) for _ in range(size)],
+               [rng.random() < 0.05 for _ in range(size)])
+    for _ in range(number):
+        bj.settle_batch(*columns)
+
+
+def bench_print_stats(players):
+    def run(number):
+        table = _seat(players)
+        ui = bj.UserInterface(bj.TITLE_ART, bj.RULE_ART, 0, writer=lambda string: None)
+        table.start_round([10] * players)
+        table.deal()
+        hands = [hand for player in table.players for hand in player.hands]
+        for _ in range(number):
+            for hand in hands:  # Full redraw, nothing cached
+                hand.view = None
+            table.dealer.hand.view = None
+            ui.clear()
+            ui.print_stats(table.dealer, table.players)
+            ui.flush()  # The frame goes out in one writer call
+    return run
+
+
+def bench_rounds(decks):
+    def run(number):
+        table = _seat(1, decks)
+        bets = [10]
+        for _ in range(number):
+            table.start_round(bets)
+            table.deal()
+            table.play_players(bj.strategy_policy)
+            table.play_dealer()
+            table.settle()
+            table.collect()
+    return run
+
+
+def bench_seat_rounds(seats):
+    def run(number):
+        table = bj.SeatTable(seats, 10 ** 9, deck=bj.Deck(seats // 6 + 8, random.Random(SEED)))
+        bets = [10] * seats
+        for _ in range(number):
+            table.play_round(bets)
+    return run
+
+
+def bench_import(repeat):
+    # Cold import in a fresh interpreter, as paid by every simulate worker, in ns
+    best = None
+    for _ in range(repeat):
+        lines = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import BlackJack'],
+                               cwd=ROOT, capture_output=True, text=True, check=True).stderr
+        elapsed = int(lines.splitlines()[-1].split('|')[1]) * 1000  # Cumulative us
+        best = elapsed if best is None or elapsed < best else best
+    return best
+
+
+def run_all(quick=False):
+    scale = 10 if quick else 1
+    cases = {
+        'deck.get_card': (bench_get_card, 200000),
+        'deck.return_cards': (bench_return_cards, 100000),
+        'deck.composition': (bench_composition, 100000),
+        'hand.add_card': (bench_add_card, 200000),
+        'hand_options': (bench_hand_options, 200000),
+        'split': (bench_split, 50000),
+        'table.settle[7p]': (bench_settle, 20000),
+        'settle_batch[1k]': (bench_settle_batch, 200),
+    }
+    for players in range(1, 8):
+        cases[f'print_stats[{players}p]'] = (bench_print_stats(players), 500)
+    for decks in (1, 2, 6, 8):
+        cases[f'round[{decks}d]'] = (bench_rounds(decks), 20000)
+    cases['seat_round[1000s]'] = (bench_seat_rounds(1000), 50)
+
+    bj.load_strategy()
+    results = {}
+    for name, (func, number) in cases.items():
+        results[name] = round(_time(func, max(number // scale, 1), 3 if quick else 5), 1)
+    results['import[cold]'] = bench_import(3 if quick else 5)
+    for decks in (1, 2, 6, 8):
+        results[f'rounds_per_sec[{decks}d]'] = round(1e9 / results[f'round[{decks}d]'])
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Names of timings slower than baseline by more than tolerance."""
+    slower = []
+    for name, value in results.items():
+        if name.startswith('rounds_per_sec') or name not in baseline:
+            continue
+        if value > baseline[name] * (1 + tolerance):
+            slower.append(name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BlackJack hot path benchmarks')
+    parser.add_argument('--quick', action='store_true', help='fewer iterations')
+    parser.add_argument('--save', metavar='FILE', help='write results as a baseline')
+    parser.add_argument('--compare', metavar='FILE', nargs='?', const=BASELINE,
+                        help='fail on timings slower than the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run_all(args.quick)
+    report = {'python': platform.python_version(), 'seed': SEED, 'unit': 'ns/op',
+              'seat_bytes': bj.SeatTable(1000).seat_bytes, 'results': results}
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+
+    if args.compare:
+        with open(args.compare) as file:
+            slower = compare(results, json.load(file)['results'], args.tolerance)
+        if slower:
+            print('Slower than baseline: ' + ', '.join(slower), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import BlackJack  # noqa: E402
+
+ROUNDS = BlackJack.SHARD_ROUNDS + 1500  # Two shards, each replayed on its own shoe
+
+
+@pytest.mark.parametrize('mode', BlackJack.Deck.MODES)
+def test_replay_reproduces_simulate(mode, tmp_path):
+    path = str(tmp_path / 'rounds.bjhh')
+    result = BlackJack.simulate(ROUNDS, players=3, policy=BlackJack.strategy_policy, workers=2,
+                                seed=5, history=path, shuffle=mode, penetration=0.6)
+    assert not [name for name in os.listdir(tmp_path) if name != 'rounds.bjhh']
+
+    totals = {'rounds': 0, 'net': 0, 'wagered': 0}
+    statuses = dict.fromkeys(BlackJack.SIM_STATUSES, 0)
+
+    def settled(table):
+        totals['rounds'] += 1
+        for player in table.players:
+            for hand in player.hands:
+                totals['net'] += hand.bet - hand.stake
+                totals['wagered'] += hand.stake
+                if hand.status in statuses:
+                    statuses[hand.status] += 1
+
+    with BlackJack.HistoryReader(path) as reader:
+        assert len(reader) == ROUNDS
+        assert [record[0] for record in reader] == list(range(1, ROUNDS + 1))
+        reader.replay(settled=settled)
+    assert totals == {key: result[key] for key in totals}
+    assert statuses == {status: result[status] for status in statuses}
+
+
+def test_replay_fast_forwards_to_a_round(tmp_path):
+    path = str(tmp_path / 'rounds.bjhh')
+    BlackJack.simulate(ROUNDS, players=2, policy=BlackJack.strategy_policy, workers=2, seed=9,
+                       history=path, shuffle='cut')
+    rnd = BlackJack.SHARD_ROUNDS + 700
+    got = []
+    with BlackJack.HistoryReader(path) as reader:
+        reader.replay(start=rnd, stop=rnd, settled=lambda table: got.append(
+            [(hand.status, hand.bet) for player in table.players for hand in player.hands]))
+        expected = [(hand[3], hand[6]) for hand in reader.query(start=rnd, stop=rnd + 1)]
+    assert got == [expected]
@@ -0,0 +1,63 @@
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import BlackJack  # noqa: E402
+
+WARMUP = 2000
+ROUNDS = 20000
+
+
+def make_table(seed=7, players=5):
+    rng = random.Random(seed)
+    deck = BlackJack.Deck(6, random.Random(seed), 'cut', 0.75)
+    table = BlackJack.Table([BlackJack.Player(i, 10 ** 12) for i in range(players)], deck=deck)
+
+    def bet_policy(player):
+        return rng.choice((10, 25, 100))
+
+    return table, bet_policy
+
+
+def test_play_round_reuses_hands(monkeypatch):
+    # Hands are only made until every seat has held its most hands once
+    BlackJack.load_strategy()  # Splits, doubles and surrenders take spare hands
+    made = []
+    init = BlackJack.Hand.__init__
+
+    def counted(self, *args, **kwargs):
+        made.append(1)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(BlackJack.Hand, '__init__', counted)
+    table, bet_policy = make_table()
+    splits = []
+    for _ in range(WARMUP + ROUNDS):
+        table.play_round(bet_policy, BlackJack.strategy_policy, lambda table: splits.extend(
+            player for player in table.players if len(player.hands) > 1))
+    assert splits
+    assert len(made) <= len(table.players) * BlackJack.SeatTable.HANDS + 1  # And the dealer's
+
+
+def test_play_round_memory_is_flat():
+    table, bet_policy = make_table()
+    BlackJack.load_strategy()
+    tracemalloc.start()
+    try:
+        for _ in range(WARMUP):
+            table.play_round(bet_policy, BlackJack.strategy_policy)
+        gc.collect()
+        before = tracemalloc.take_snapshot()
+        for _ in range(ROUNDS):
+            table.play_round(bet_policy, BlackJack.strategy_policy)
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    growth = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    assert growth < 16 * 1024, f'{growth} bytes kept over {ROUNDS} rounds'
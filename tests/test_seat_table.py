@@ -0,0 +1,53 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import BlackJack  # noqa: E402
+
+ROUNDS = 2000
+
+
+def bet_of(seat):
+    return 10 + seat % 3 * 2
+
+
+def play_table(seats, decks, mode):
+    deck = BlackJack.Deck(decks, random.Random(4), mode, 0.7)
+    table = BlackJack.Table([BlackJack.Player(seat, 10 ** 9) for seat in range(seats)], deck=deck)
+    policy = BlackJack.StrategyPolicy(decks)
+    rounds = []
+
+    def settled(table):
+        rounds.append([(BlackJack.STATUS_CODE[hand.status], hand.bet, hand.stake, hand.value)
+                       for player in table.players for hand in player.hands])
+
+    for _ in range(ROUNDS):
+        table.play_round(lambda player: bet_of(player.name), policy, settled)
+    return rounds, [player.balance for player in table.players], deck.position, deck.shuffles
+
+
+def play_seat_table(seats, decks, mode):
+    deck = BlackJack.Deck(decks, random.Random(4), mode, 0.7)
+    table = BlackJack.SeatTable(seats, 10 ** 9, deck=deck)
+    bets = [bet_of(seat) for seat in range(seats)]
+    rounds = []
+
+    def settled(table):
+        slots = [slot for seat in range(seats)
+                 for slot in range(seat * table.HANDS, seat * table.HANDS + table.counts[seat])]
+        rounds.append([(table.statuses[slot], table.bets[slot], table.stakes[slot],
+                        table.values[slot]) for slot in slots])
+
+    for _ in range(ROUNDS):
+        table.play_round(bets, settled)
+    return rounds, list(table.balances), deck.position, deck.shuffles
+
+
+@pytest.mark.parametrize('mode', BlackJack.Deck.MODES)
+@pytest.mark.parametrize('seats, decks', [(1, 1), (7, 2), (50, 8)])
+def test_seat_table_matches_table(mode, seats, decks):
+    assert play_seat_table(seats, decks, mode) == play_table(seats, decks, mode)